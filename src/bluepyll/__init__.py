@@ -2,7 +2,10 @@
 BluePyll - A Python library for controlling BlueStacks emulator
 """
 
-from .app import BluePyllApp
+from .adb_pool import AdbConnectionPool
+from .app import AppStatus, BluePyllApp
+from .async_controller import AsyncBluePyllController
+from .boot import BootStatus
 from .constants import BluestacksConstants
 from .controller import BluePyllController
 from .exceptions import (
@@ -13,12 +16,24 @@ from .exceptions import (
     StateError,
     TimeoutError,
 )
+from .fleet import BluePyllFleet
+from .input_queue import InputQueue
+from .launcher import BluestacksLauncher
+from .logcat import LogcatWatcher
+from .matching import Match, NeedleCache, match_template, needle_cache
+from .ocr_server import OcrClient, OcrServer
+from .shell_session import ShellSession
 from .state_machine import AppLifecycleState, BluestacksState, StateMachine
-from .ui import BluePyllElement, BluePyllElements
-from .utils import ImageTextChecker
+from .stream import ScreenRecordStream
+from .touch import SendeventTouch
+from .ui import BluePyllElement, BluePyllElements, locate_many
+from .utils import ImageTextChecker, OcrCache
+from .waiting import Backoff, wait_stats, wait_until
 
 __all__ = [
     "BluePyllController",
+    "AsyncBluePyllController",
+    "BluePyllFleet",
     "BluePyllApp",
     "BluePyllError",
     "EmulatorError",
@@ -33,6 +48,26 @@ __all__ = [
     "BluePyllElements",
     "BluePyllElement",
     "ImageTextChecker",
+    "ShellSession",
+    "ScreenRecordStream",
+    "AdbConnectionPool",
+    "InputQueue",
+    "SendeventTouch",
+    "AppStatus",
+    "LogcatWatcher",
+    "Backoff",
+    "wait_until",
+    "wait_stats",
+    "BootStatus",
+    "BluestacksLauncher",
+    "OcrServer",
+    "OcrClient",
+    "OcrCache",
+    "Match",
+    "match_template",
+    "NeedleCache",
+    "needle_cache",
+    "locate_many",
 ]
 
 __version__ = "0.1.13"
@@ -0,0 +1,187 @@
+"""
+ADB connection pooling for BluePyll
+"""
+
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from queue import Empty, Queue
+
+from adb_shell.adb_device import AdbDevice, AdbDeviceTcp
+from adb_shell.transport.tcp_transport import TcpTransport
+
+from .constants import BluestacksConstants
+from .exceptions import ConnectionError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class AdbConnectionPool:
+    """
+    A pool of extra ADB connections to one device for bulk transfers.
+
+    Each connection is its own TCP socket, so a large transfer (a screenshot,
+    a pull or a screen stream) running on a pooled connection never delays
+    latency-sensitive commands such as taps and key events issued on the
+    controller's own connection.
+
+    Attributes:
+        ip (str): The ADB IP address of the device
+        port (int): The ADB port of the device
+        size (int): Number of pooled connections
+    """
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        size: int = 1,
+        default_transport_timeout_s: float | None = None,
+    ) -> None:
+        """
+        Initialize an AdbConnectionPool.
+
+        Connections are opened lazily, the first time they are acquired.
+
+        Args:
+            ip (str): The ADB IP address of the device
+            port (int): The ADB port of the device
+            size (int): Number of pooled connections
+            default_transport_timeout_s (float | None): Default timeout for TCP packets
+        """
+        if size < 0:
+            raise ValueError("size must be a non-negative integer")
+        self.ip: str = ip
+        self.port: int = port
+        self.size: int = int(size)
+        self._devices: list[AdbDeviceTcp] = [
+            AdbDeviceTcp(
+                ip, port, default_transport_timeout_s=default_transport_timeout_s
+            )
+            for _ in range(self.size)
+        ]
+        self._idle: Queue[AdbDeviceTcp] = Queue()
+        for device in self._devices:
+            self._idle.put(device)
+
+    @contextmanager
+    def acquire(self, timeout_s: float | None = None) -> Iterator[AdbDeviceTcp]:
+        """
+        Borrow a connected device from the pool.
+
+        A connection that fails while borrowed is closed, so it reconnects the
+        next time it is acquired.
+
+        Args:
+            timeout_s (float | None): Time to wait for a free connection
+
+        Yields:
+            AdbDeviceTcp: A connected device
+
+        Raises:
+            TimeoutError: If no connection becomes free in time
+            ConnectionError: If the connection cannot be established
+        """
+        if not self._devices:
+            raise ConnectionError("The ADB connection pool is empty")
+        try:
+            device: AdbDeviceTcp = self._idle.get(timeout=timeout_s)
+        except Empty:
+            raise TimeoutError(
+                f"No pooled ADB connection free within {timeout_s} seconds"
+            )
+        try:
+            if not device.available:
+                logger.debug(f"Opening pooled ADB connection to {self.ip}:{self.port}")
+                try:
+                    device.connect()
+                except Exception as e:
+                    raise ConnectionError(f"Error opening pooled ADB connection: {e}")
+            yield device
+        except Exception:
+            device.close()
+            raise
+        finally:
+            self._idle.put(device)
+
+    def shell(
+        self,
+        command: str,
+        acquire_timeout_s: float | None = BluestacksConstants.POOL_ACQUIRE_TIMEOUT_S,
+        **kwargs,
+    ) -> str | bytes:
+        """
+        Run a shell command on a pooled connection.
+
+        Args:
+            command (str): The shell command to run
+            acquire_timeout_s (float | None): Time to wait for a free connection
+            **kwargs: Additional arguments passed to 'AdbDeviceTcp.shell'
+
+        Returns:
+            str | bytes: The command output
+
+        Raises:
+            TimeoutError: If no connection becomes free in time
+        """
+        with self.acquire(timeout_s=acquire_timeout_s) as device:
+            return device.shell(command, **kwargs)
+
+    def close(self) -> None:
+        """Close every pooled connection; they reopen on their next use."""
+        for device in self._devices:
+            try:
+                device.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled ADB connection: {e}")
+
+
+class StreamConnection:
+    """
+    A dedicated ADB connection for one long-lived stream (screenrecord, logcat).
+
+    Long-lived streams hold their connection for as long as they run, so they
+    get their own socket instead of a pool slot. A stream blocked waiting for
+    output can be woken from another thread with 'interrupt'.
+
+    Attributes:
+        device (AdbDevice): The device to stream from
+    """
+
+    def __init__(self, ip: str, port: int) -> None:
+        """
+        Initialize a StreamConnection.
+
+        Args:
+            ip (str): The ADB IP address of the device
+            port (int): The ADB port of the device
+        """
+        self._transport: TcpTransport = TcpTransport(ip, port)
+        self.device: AdbDevice = AdbDevice(self._transport)
+
+    def connect(self) -> None:
+        """
+        Open the connection.
+
+        Raises:
+            ConnectionError: If the connection cannot be established
+        """
+        try:
+            self.device.connect()
+        except Exception as e:
+            raise ConnectionError(f"Error opening stream ADB connection: {e}")
+
+    def interrupt(self) -> None:
+        """Shut the socket down, so a read blocked in another thread fails at once."""
+        # The device holds its transport lock while reading, so bypass it
+        try:
+            self._transport.close()
+        except Exception as e:
+            logger.debug(f"Error interrupting stream ADB connection: {e}")
+
+    def close(self) -> None:
+        """Close the connection."""
+        try:
+            self.device.close()
+        except Exception as e:
+            logger.debug(f"Error closing stream ADB connection: {e}")
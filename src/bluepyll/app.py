@@ -1,6 +1,75 @@
+import re
+from dataclasses import dataclass
+
 from .state_machine import AppLifecycleState, StateMachine
 
 
+@dataclass(frozen=True)
+class AppStatus:
+    """
+    A snapshot of an app's process and focus state.
+
+    Attributes:
+        running (bool): Whether the app's main process is alive
+        focused (bool): Whether one of the app's activities is the resumed (foreground) activity
+        pid (int | None): The pid of the app's main process, if running
+    """
+
+    running: bool
+    focused: bool
+    pid: int | None = None
+
+    _SEPARATOR = "__BLUEPYLL_APP_STATUS__"
+    # The current resumed activity, but not 'mLastResumedActivity'
+    _RESUMED_ACTIVITY_PATTERN = (
+        r"^ *(mResumedActivity|topResumedActivity|ResumedActivity)[:=]"
+    )
+
+    @classmethod
+    def command(cls, package_name: str) -> str:
+        """
+        Build the single shell command that reports an app's status.
+
+        Uses 'pidof' for liveness and the resumed activity from
+        'dumpsys activity activities' for focus.
+
+        Args:
+            package_name (str): The app's package name
+
+        Returns:
+            str: The shell command
+        """
+        return (
+            f"pidof {package_name}; echo {cls._SEPARATOR}; "
+            "dumpsys activity activities | "
+            f"grep -E '{cls._RESUMED_ACTIVITY_PATTERN}'"
+        )
+
+    @classmethod
+    def from_output(cls, package_name: str, output: str) -> "AppStatus":
+        """
+        Parse the output of 'AppStatus.command'.
+
+        Args:
+            package_name (str): The app's package name
+            output (str): The command output
+
+        Returns:
+            AppStatus: The parsed status
+        """
+        pid_output, _, activity_output = (output or "").partition(cls._SEPARATOR)
+        pids: list[str] = pid_output.split()
+        pid: int | None = int(pids[0]) if pids and pids[0].isdigit() else None
+        # 'mLastResumedActivity' names an app that is no longer in front, so only
+        # the current resumed-activity fields count
+        focused: bool = any(
+            f" {package_name}/" in line
+            for line in activity_output.splitlines()
+            if re.match(cls._RESUMED_ACTIVITY_PATTERN, line)
+        )
+        return cls(running=pid is not None, focused=focused, pid=pid)
+
+
 class BluePyllApp:
     def __init__(self, app_name: str, package_name: str) -> None:
         if not app_name:
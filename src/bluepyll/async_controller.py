@@ -0,0 +1,406 @@
+"""
+Asyncio controller for the BlueStacks emulator.
+"""
+
+import asyncio
+import logging
+
+import numpy as np
+
+from .app import AppStatus, BluePyllApp
+from .boot import BootStatus
+from .constants import BluestacksConstants
+from .exceptions import BluePyllError, TimeoutError
+from .frames import FrameCache, parse_raw_screencap
+from .state_machine import AppLifecycleState, BluestacksState, StateMachine
+from .ui import BluePyllElement
+from .waiting import Backoff, async_wait_until
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBluePyllController:
+    """
+    An asyncio twin of BluePyllController.
+
+    All ADB I/O goes through an asyncio ADB transport and every wait is an
+    'asyncio.sleep', so one event loop can drive many emulators without a
+    thread per device. Image matching runs in a worker thread so it does not
+    block the loop.
+
+    Unlike BluePyllController, this class does not launch BlueStacks itself; it
+    attaches over ADB to an emulator that is already starting or running.
+
+    Requires the optional async ADB dependencies (``pip install bluepyll[async]``).
+
+    Attributes:
+        device (AdbDeviceTcpAsync): The asyncio ADB device
+        running_apps (list[BluePyllApp]): Apps opened through this controller
+        bluestacks_state (StateMachine): The emulator state
+        screenshot_cache (FrameCache): Time-bounded cache of the last capture
+    """
+
+    def __init__(
+        self,
+        ip: str = BluestacksConstants.DEFAULT_IP,
+        port: str | int = BluestacksConstants.DEFAULT_PORT,
+        ref_window_size: tuple[int, int] = BluestacksConstants.DEFAULT_REF_WINDOW_SIZE,
+        raw_screenshots: bool = False,
+        screenshot_cache_ttl_s: float = BluestacksConstants.SCREENSHOT_CACHE_TTL_S,
+    ) -> None:
+        try:
+            from adb_shell.adb_device_async import AdbDeviceTcpAsync
+        except ImportError as e:
+            raise BluePyllError(
+                "AsyncBluePyllController requires the async ADB dependencies. Install them with 'pip install bluepyll[async]'."
+            ) from e
+        try:
+            port: int = int(port)
+        except ValueError as e:
+            logger.error(f"ValueError in port: {e}")
+            raise ValueError(f"Error in port: {e}")
+        logger.info("Initializing AsyncBluePyllController")
+        self.ip: str = ip
+        self.port: int = port
+        self.device: AdbDeviceTcpAsync = AdbDeviceTcpAsync(ip, port)
+        self._ref_window_size: tuple[int, int] = ref_window_size
+        self.raw_screenshots: bool = raw_screenshots
+        self.screenshot_cache: FrameCache = FrameCache(ttl_s=screenshot_cache_ttl_s)
+        self.running_apps: list[BluePyllApp] | list = list()
+        self.bluestacks_state = StateMachine(
+            current_state=BluestacksState.CLOSED,
+            transitions=BluestacksState.get_transitions(),
+        )
+
+    @property
+    def ref_window_size(self) -> tuple[int, int]:
+        return self._ref_window_size
+
+    async def connect_adb(self) -> bool:
+        if self.device.available:
+            return True
+        logger.debug("ADB device not connected. Attempting to Connect ADB device...")
+        try:
+            await self.device.connect()
+        except Exception as e:
+            logger.debug(f"ADB device could not connect: {e}")
+        if self.device.available:
+            logger.debug("ADB device connected.")
+            return True
+        logger.warning("ADB device could not connect.")
+        return False
+
+    async def disconnect_adb(self) -> bool:
+        if not self.device.available:
+            return True
+        logger.debug("ADB device is connected. Attempting to disconnect ADB device...")
+        await self.device.close()
+        logger.debug("ADB device disconnected.")
+        return not self.device.available
+
+    async def shell(
+        self,
+        command: str,
+        timeout_s: float | None = BluestacksConstants.DEFAULT_TIMEOUT,
+        decode: bool = True,
+    ) -> str | bytes:
+        """
+        Run a shell command on the device.
+
+        Args:
+            command (str): The shell command to run
+            timeout_s (float | None): Time to wait for the command to finish
+            decode (bool): Whether to decode the output to a string
+
+        Returns:
+            str | bytes: The command output
+        """
+        try:
+            return await self.device.shell(command, timeout_s=timeout_s, decode=decode)
+        finally:
+            if command.lstrip().startswith(
+                BluestacksConstants.SCREEN_MUTATING_COMMANDS
+            ):
+                self.screenshot_cache.invalidate()
+
+    async def get_boot_status(self) -> BootStatus | None:
+        """
+        Probe over ADB how far Android has booted, in a single shell call.
+
+        Returns:
+            BootStatus | None: The boot status, or None if ADB is not reachable yet
+        """
+        if not await self.connect_adb():
+            return None
+        try:
+            output: str = await self.device.shell(
+                BootStatus.command(), timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
+            )
+        except Exception as e:
+            logger.debug(f"Error probing boot status: {e}")
+            return None
+        return BootStatus.from_output(output)
+
+    async def wait_for_load(
+        self, timeout_s: float = BluestacksConstants.BOOT_TIMEOUT
+    ) -> None:
+        """
+        Wait until Android has finished booting, then move to the ready state.
+
+        Args:
+            timeout_s (float): Time to wait for the emulator to finish booting
+
+        Raises:
+            TimeoutError: If the emulator is not ready within 'timeout_s'
+        """
+        if self.bluestacks_state.current_state == BluestacksState.READY:
+            return
+        if self.bluestacks_state.current_state == BluestacksState.CLOSED:
+            self.bluestacks_state.transition_to(BluestacksState.LOADING)
+        logger.debug("Waiting for Bluestacks to load...")
+
+        async def boot_completed() -> bool:
+            status: BootStatus | None = await self.get_boot_status()
+            return status is not None and status.ready
+
+        if await async_wait_until(
+            boot_completed,
+            deadline=timeout_s,
+            backoff=Backoff(max_s=BluestacksConstants.DEFAULT_WAIT_TIME),
+            label="wait_for_load",
+        ):
+            self.bluestacks_state.transition_to(BluestacksState.READY)
+            logger.info("Bluestacks is loaded & ready.")
+            return
+        raise TimeoutError(
+            f"Bluestacks did not finish loading within {timeout_s} seconds"
+        )
+
+    async def capture_screenshot(
+        self, raw: bool | None = None
+    ) -> bytes | np.ndarray | None:
+        """
+        Capture a screenshot of the emulator screen via ADB.
+
+        Args:
+            raw (bool | None): If True, capture the raw framebuffer and return an RGBA
+                array. Defaults to 'raw_screenshots'.
+
+        Returns:
+            bytes | np.ndarray | None: PNG bytes, an RGBA array in raw mode, or None on failure
+        """
+        raw = self.raw_screenshots if raw is None else raw
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot capture screenshot - Bluestacks is not ready")
+            return None
+        cached_screenshot: bytes | np.ndarray | None = self.screenshot_cache.get(raw)
+        if cached_screenshot is not None:
+            return cached_screenshot
+        if not await self.connect_adb():
+            logger.warning(
+                "ADB device could not connect. Skipping 'capture_screenshot' method call."
+            )
+            return None
+        try:
+            screenshot_bytes: bytes = await self.shell(
+                "screencap" if raw else "screencap -p", decode=False
+            )
+            screenshot: bytes | np.ndarray = (
+                parse_raw_screencap(screenshot_bytes) if raw else screenshot_bytes
+            )
+            self.screenshot_cache.put(screenshot, raw)
+            return screenshot
+        except Exception as e:
+            logger.error(f"Error capturing screenshot: {e}")
+            return None
+
+    async def where(
+        self,
+        element: BluePyllElement,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
+        max_retries: int = 2,
+    ) -> tuple[int, int] | None:
+        """
+        Find an element on screen.
+
+        Args:
+            element (BluePyllElement): The element to look for
+            screenshot_img_bytes (bytes | np.ndarray | None): A frame to search instead of capturing one
+            max_retries (int): Number of attempts before giving up
+
+        Returns:
+            tuple[int, int] | None: The coords of the center of the element, or None if not found
+        """
+        if not element.path:
+            logger.warning("Cannot find UI element - BluePyllElement path is not set")
+            return None
+        if self.bluestacks_state.current_state == BluestacksState.CLOSED:
+            logger.warning("Cannot find UI element - Bluestacks is closed")
+            return None
+
+        async def find_ui_element() -> tuple[int, int] | None:
+            screen_image: bytes | np.ndarray | None = (
+                screenshot_img_bytes
+                if screenshot_img_bytes is not None
+                else await self.capture_screenshot()
+            )
+            if screen_image is not None and len(screen_image):
+                return await asyncio.to_thread(element.locate, screen_image)
+            return None
+
+        # A provided screenshot never changes, so it is only searched once
+        ui_coords: tuple[int, int] | None = await async_wait_until(
+            find_ui_element,
+            backoff=Backoff.fixed(BluestacksConstants.DEFAULT_WAIT_TIME),
+            max_attempts=(
+                1
+                if screenshot_img_bytes is not None
+                else (
+                    max_retries if max_retries is not None and max_retries > 0 else None
+                )
+            ),
+            label="where",
+        )
+        if ui_coords:
+            return ui_coords
+        logger.debug(f"Wasn't able to find BluePyllElement: {element.label}")
+        return None
+
+    async def click_coord(self, coords: tuple[int, int], times: int = 1) -> bool:
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot click coords - Bluestacks is not ready")
+            return False
+        if not await self.connect_adb():
+            logger.warning(
+                "ADB device not connected. Skipping 'click_coord' method call."
+            )
+            return False
+        tap_command: str = " && ".join(
+            [f"input tap {coords[0]} {coords[1]}"] * max(int(times), 1)
+        )
+        await self.shell(tap_command)
+        logger.debug(f"Click event sent via ADB at coords x={coords[0]}, y={coords[1]}")
+        return True
+
+    async def click(
+        self,
+        element: BluePyllElement,
+        times: int = 1,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
+        max_tries: int = 2,
+    ) -> bool:
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot click coords - Bluestacks is not ready")
+            return False
+        coord: tuple[int, int] | None = await self.where(
+            element, screenshot_img_bytes=screenshot_img_bytes, max_retries=max_tries
+        )
+        if not coord:
+            logger.debug(f"UI element {element.label} not found")
+            return False
+        return await self.click_coord(coord, times=times)
+
+    async def get_app_status(self, app: BluePyllApp) -> AppStatus | None:
+        """
+        Get an app's liveness and focus in a single shell call.
+
+        Args:
+            app (BluePyllApp): The app to check
+
+        Returns:
+            AppStatus | None: The app's status, or None if it could not be checked
+        """
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot check app status - Bluestacks is not ready")
+            return None
+        if not await self.connect_adb():
+            logger.warning(
+                "ADB device not connected. Skipping 'get_app_status' method call."
+            )
+            return None
+        try:
+            output: str = await self.shell(AppStatus.command(app.package_name))
+        except Exception as e:
+            logger.debug(f"Error checking app status: {e}")
+            return None
+        return AppStatus.from_output(app.package_name, output)
+
+    async def is_app_running(self, app: BluePyllApp) -> bool:
+        """
+        Check if an app is running in the foreground.
+
+        Args:
+            app (BluePyllApp): The app to check
+
+        Returns:
+            bool: True if the app is running and focused, False otherwise
+        """
+        status: AppStatus | None = await self.get_app_status(app)
+        return status is not None and status.running and status.focused
+
+    async def open_app(
+        self,
+        app: BluePyllApp,
+        timeout: int = BluestacksConstants.APP_START_TIMEOUT,
+        wait_time: int = BluestacksConstants.DEFAULT_WAIT_TIME,
+    ) -> None:
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot open app - Bluestacks is not ready")
+            return
+        if not await self.connect_adb():
+            logger.warning(
+                "ADB device could not connect. Skipping 'open_app' method call."
+            )
+            return
+        await self.shell(f"monkey -p {app.package_name} -v 1", timeout_s=timeout)
+        if await async_wait_until(
+            lambda: self.is_app_running(app),
+            deadline=timeout,
+            backoff=Backoff(max_s=wait_time),
+            label="open_app",
+        ):
+            app.app_state.transition_to(AppLifecycleState.LOADING)
+            self.running_apps.append(app)
+            logger.info(f"{app.app_name.title()} app opened via ADB")
+            return
+        logger.warning(
+            f"App {app.app_name.title()} did not start within {timeout} seconds"
+        )
+
+    async def close_app(
+        self,
+        app: BluePyllApp,
+        timeout: int = BluestacksConstants.APP_START_TIMEOUT,
+        wait_time: int = BluestacksConstants.DEFAULT_WAIT_TIME,
+    ) -> None:
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot close app - Bluestacks is not ready")
+            return
+        if not await self.connect_adb():
+            logger.warning(
+                "ADB device could not connect. Skipping 'close_app' method call."
+            )
+            return
+
+        async def is_closed() -> bool:
+            status: AppStatus | None = await self.get_app_status(app)
+            return status is not None and not status.running
+
+        await self.shell(f"am force-stop {app.package_name}")
+        if await async_wait_until(
+            is_closed,
+            deadline=timeout,
+            backoff=Backoff(max_s=wait_time),
+            label="close_app",
+        ):
+            app.app_state.transition_to(AppLifecycleState.CLOSED)
+            self.running_apps = [
+                existing_app
+                for existing_app in self.running_apps
+                if existing_app != app
+            ]
+            logger.info(f"{app.app_name.title()} app closed via ADB")
+            return
+        logger.warning(
+            f"App {app.app_name.title()} did not close within {timeout} seconds"
+        )
@@ -0,0 +1,69 @@
+"""
+ADB boot readiness probing for BluePyll
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BootStatus:
+    """
+    A snapshot of how far Android has booted.
+
+    Attributes:
+        boot_completed (bool): Whether 'sys.boot_completed' is set
+        boot_animation_stopped (bool): Whether the boot animation service has stopped
+        package_manager_ready (bool): Whether the package manager answers queries
+    """
+
+    boot_completed: bool
+    boot_animation_stopped: bool
+    package_manager_ready: bool
+
+    _SEPARATOR = "__BLUEPYLL_BOOT_STATUS__"
+
+    @property
+    def ready(self) -> bool:
+        """Whether Android is usable: booted, past the boot animation and serving packages."""
+        return (
+            self.boot_completed
+            and self.boot_animation_stopped
+            and self.package_manager_ready
+        )
+
+    @classmethod
+    def command(cls) -> str:
+        """
+        Build the single shell command that reports the boot status.
+
+        Returns:
+            str: The shell command
+        """
+        return (
+            f"getprop sys.boot_completed; echo {cls._SEPARATOR}; "
+            f"getprop init.svc.bootanim; echo {cls._SEPARATOR}; "
+            "pm path android 2>/dev/null"
+        )
+
+    @classmethod
+    def from_output(cls, output: str) -> "BootStatus":
+        """
+        Parse the output of 'BootStatus.command'.
+
+        Args:
+            output (str): The command output
+
+        Returns:
+            BootStatus: The parsed status
+        """
+        sections: list[str] = [
+            section.strip() for section in (output or "").split(cls._SEPARATOR)
+        ]
+        sections += [""] * (3 - len(sections))
+        boot_completed, boot_animation, package_path = sections[:3]
+        return cls(
+            boot_completed=boot_completed == "1",
+            # Some images never start the boot animation service, leaving it unset
+            boot_animation_stopped=boot_animation in ("stopped", ""),
+            package_manager_ready=package_path.startswith("package:"),
+        )
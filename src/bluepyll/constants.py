@@ -2,6 +2,7 @@
 Constants for BluePyll configuration
 """
 
+import os
 from typing import Tuple
 
 
@@ -19,9 +20,46 @@ class BluestacksConstants:
     # Display configuration
     DEFAULT_REF_WINDOW_SIZE: Tuple[int, int] = (1920, 1080)
 
+    # Screenshot configuration
+    SCREENSHOT_CACHE_TTL_S: float = 0.1
+    # Shell commands that may change what is on screen (and so invalidate cached screenshots)
+    SCREEN_MUTATING_COMMANDS: Tuple[str, ...] = ("input", "monkey", "am ", "sendevent")
+
+    # OCR configuration
+    # Pixels of context kept around an element's region when reading its text
+    OCR_REGION_PADDING: int = 4
+    # Size budget of each ImageTextChecker's OCR result cache (0 disables it)
+    OCR_CACHE_MAX_BYTES: int = 1024 * 1024
+    # Size step of the buckets batched OCR groups images into (padding per image stays below it)
+    OCR_BATCH_BUCKET_PX: int = 32
+
+    # Image matching configuration
+    # Matcher used by BluePyllElement.locate/where: "opencv" or "pyautogui"
+    MATCH_BACKEND: str = "opencv"
+    # Pixels of slack searched around a static element's region
+    MATCH_REGION_PADDING: int = 8
+    # Extra needle scales tried, in order, when a controller enables pyramid matching
+    MATCH_SCALES: tuple[float, ...] = (1.0, 0.9, 1.1, 0.8, 1.25, 0.75, 1.5)
+    # Score at which pyramid matching stops trying further scales
+    MATCH_SCALE_EXACT_SCORE: float = 0.98
+    # Consecutive misses of a learned scale after which every scale is searched again
+    MATCH_SCALE_MAX_MISSES: int = 3
+    # Width and height in pixels of the tiles a frame tracker hashes
+    DIRTY_TILE_SIZE: int = 64
+
+    # Per-user state (tracked processes, cached paths)
+    USER_STATE_DIR: str = os.path.join(os.path.expanduser("~"), ".bluepyll")
+    # Directory levels searched below each root when looking for HD-Player.exe
+    PATH_SEARCH_MAX_DEPTH: int = 4
+
     # Operation timeouts
     DEFAULT_MAX_RETRIES: int = 10
     DEFAULT_WAIT_TIME: int = 1
     DEFAULT_TIMEOUT: int = 30
+    # Time a bulk transfer waits for a pooled connection before using the main one
+    POOL_ACQUIRE_TIMEOUT_S: float = 1.0
     PROCESS_WAIT_TIMEOUT: int = 10
     APP_START_TIMEOUT: int = 60
+    BOOT_TIMEOUT: int = 120
+    # Time without an ADB answer before boot detection falls back to the loading screen
+    BOOT_PROBE_FALLBACK_S: int = 30
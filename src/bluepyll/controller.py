@@ -6,19 +6,38 @@ import io
 import logging
 import os
 import time
+from contextlib import AbstractContextManager
 from pprint import pprint
 
-import psutil
-import win32con
-import win32gui
+import numpy as np
 from adb_shell.adb_device import AdbDeviceTcp
+from adb_shell.constants import DEFAULT_READ_TIMEOUT_S
+from adb_shell.exceptions import TcpTimeoutException
 from PIL import Image, ImageGrab
 
-from .app import BluePyllApp
+from .adb_pool import AdbConnectionPool
+from .app import AppStatus, BluePyllApp
+from .boot import BootStatus
 from .constants import BluestacksConstants
+from .discovery import load_cached_path, save_cached_path, search_for_hd_player
+from .exceptions import TimeoutError
+from .frames import DirtyTileTracker, FrameCache, parse_raw_screencap
+from .input_queue import InputQueue
+from .launcher import BluestacksLauncher
+from .lazy import lazy_import
+from .logcat import LogcatWatcher
+from .matching import Match
+from .shell_session import ShellSession
 from .state_machine import AppLifecycleState, BluestacksState, StateMachine
-from .ui import BluePyllElement, BluePyllElements
+from .stream import ScreenRecordStream
+from .touch import SendeventTouch
+from .ui import BluePyllElement, BluePyllElements, locate_many
 from .utils import ImageTextChecker
+from .waiting import Backoff, wait_until
+
+# Window handling is only needed for the loading-screen fallback
+win32con = lazy_import("win32con")
+win32gui = lazy_import("win32gui")
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -49,12 +68,60 @@ class BluePyllController(AdbDeviceTcp):
         self,
         ip: str = BluestacksConstants.DEFAULT_IP,
         port: str | int = BluestacksConstants.DEFAULT_PORT,
+        instance: str | None = None,
         ref_window_size: tuple[int, int] = BluestacksConstants.DEFAULT_REF_WINDOW_SIZE,
+        use_shell_session: bool = False,
+        raw_screenshots: bool = False,
+        screenshot_cache_ttl_s: float = BluestacksConstants.SCREENSHOT_CACHE_TTL_S,
+        bulk_connections: int = 0,
+        input_flush_window_s: float | None = None,
+        use_sendevent: bool = False,
+        warm_up_ocr: bool = False,
+        img_txt_checker: ImageTextChecker | None = None,
+        match_backend: str = BluestacksConstants.MATCH_BACKEND,
+        match_scales: tuple[float, ...] | None = None,
+        track_dirty_tiles: bool = False,
     ) -> None:
         port: int = self._validate_and_convert_int(port, "port")
         super().__init__(ip, port)
         logger.info("Initializing BluePyllController")
-        self.img_txt_checker: ImageTextChecker = ImageTextChecker()
+        self.ip: str = ip
+        self.port: int = port
+        self.use_shell_session: bool = use_shell_session
+        self._shell_session: ShellSession = ShellSession(self)
+        self.raw_screenshots: bool = raw_screenshots
+        self.screen_stream: ScreenRecordStream | None = None
+        self.app_watcher: LogcatWatcher | None = None
+        self.launcher: BluestacksLauncher = BluestacksLauncher(port, instance=instance)
+        self.screenshot_cache: FrameCache = FrameCache(ttl_s=screenshot_cache_ttl_s)
+        self.connection_pool: AdbConnectionPool = AdbConnectionPool(
+            ip, port, size=bulk_connections
+        )
+        self.input_queue: InputQueue = InputQueue(
+            lambda command: self.shell(
+                command, timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
+            ),
+            flush_window_s=input_flush_window_s,
+        )
+        self.use_sendevent: bool = use_sendevent
+        self.touch: SendeventTouch = SendeventTouch(self)
+        self.img_txt_checker: ImageTextChecker = (
+            img_txt_checker
+            if img_txt_checker is not None
+            else ImageTextChecker(warm_up=warm_up_ocr)
+        )
+        if match_backend not in ("opencv", "pyautogui"):
+            raise ValueError(f"Unknown match backend: {match_backend}")
+        self.match_backend: str = match_backend
+        self.match_scales: tuple[float, ...] | None = (
+            tuple(float(scale) for scale in match_scales) if match_scales else None
+        )
+        # Winning pyramid scale of each frame size, filled in by BluePyllElement.match
+        self.learned_match_scales: dict[tuple[int, int], float] = {}
+        self.match_scale_misses: dict[tuple[int, int], int] = {}
+        self.frame_tracker: DirtyTileTracker | None = (
+            DirtyTileTracker() if track_dirty_tiles else None
+        )
         self._ref_window_size: tuple[int, int] = ref_window_size
         self._filepath: str | None = None
         self._default_transport_timeout_s: int = 60.0
@@ -157,6 +224,12 @@ class BluePyllController(AdbDeviceTcp):
     def _autoset_filepath(self):
         logger.debug("Setting filepath...")
 
+        cached_path: str | None = load_cached_path()
+        if cached_path:
+            self._filepath = cached_path
+            logger.debug(f"HD-Player.exe filepath loaded from cache: {self._filepath}")
+            return
+
         # Common installation paths for BlueStacks
         search_paths = [
             # Standard Program Files locations
@@ -203,23 +276,28 @@ class BluePyllController(AdbDeviceTcp):
         for potential_path in search_paths:
             if os.path.exists(potential_path) and os.path.isfile(potential_path):
                 self._filepath = potential_path
+                save_cached_path(self._filepath)
                 logger.debug(f"HD-Player.exe filepath set to {self._filepath}.")
                 return
             else:
                 logger.debug(f"Checked path (does not exist): {potential_path}")
 
-        # If we still haven't found it, try a broader search
+        # If we still haven't found it, try a broader (depth-bounded) search
         logger.debug("Performing broader search for HD-Player.exe...")
         try:
-            for root, dirs, files in os.walk("C:\\"):
-                if "HD-Player.exe" in files:
-                    potential_path = os.path.join(root, "HD-Player.exe")
-                    if "bluestacks" in root.lower():
-                        self._filepath = potential_path
-                        logger.debug(
-                            f"HD-Player.exe found via broad search: {self._filepath}"
-                        )
-                        return
+            potential_path: str | None = search_for_hd_player(
+                [
+                    os.environ.get("ProgramFiles", ""),
+                    os.environ.get("ProgramFiles(x86)", ""),
+                    os.environ.get("ProgramData", ""),
+                    os.environ.get("SystemDrive", "C:") + "\\",
+                ]
+            )
+            if potential_path:
+                self._filepath = potential_path
+                save_cached_path(self._filepath)
+                logger.debug(f"HD-Player.exe found via broad search: {self._filepath}")
+                return
         except Exception as e:
             logger.debug(f"Broad search failed: {e}")
 
@@ -287,42 +365,36 @@ class BluePyllController(AdbDeviceTcp):
         match self.bluestacks_state.current_state:
             case BluestacksState.CLOSED:
                 logger.info("Opening Bluestacks controller...")
+                if self.launcher.attach():
+                    logger.info(
+                        f"Reattached to running Bluestacks (pid {self.launcher.pid})."
+                    )
+                    self.bluestacks_state.transition_to(BluestacksState.LOADING)
+                    return
                 if not self._filepath:
                     self._autoset_filepath()
                 try:
-                    os.startfile(self._filepath)
+                    self.launcher.launch(self._filepath)
                 except Exception as e:
                     logger.error(f"Failed to start Bluestacks: {e}")
                     raise ValueError(f"Failed to start Bluestacks: {e}")
 
-                start_time: float = time.time()
-
-                for attempt in range(max_retries):
-                    is_open: bool = any(
-                        p.name().lower() == "HD-Player.exe".lower()
-                        for p in psutil.process_iter(["name"])
-                    )
-                    if is_open:
-                        logger.info("Bluestacks controller opened successfully.")
-                        self.bluestacks_state.transition_to(BluestacksState.LOADING)
-                        return
-
-                    if time.time() - start_time > timeout_s:
-                        logger.error("Timeout waiting for Bluestacks window to appear")
-                        raise Exception(
-                            "Timeout waiting for Bluestacks window to appear"
-                        )
-
-                    logger.warning(
-                        f"Attempt {attempt + 1}/{max_retries}: Could not find Bluestacks window."
-                    )
-                    time.sleep(wait_time)
+                if wait_until(
+                    self.launcher.is_alive,
+                    deadline=timeout_s,
+                    backoff=Backoff.fixed(wait_time),
+                    max_attempts=max_retries,
+                    label="open_bluestacks",
+                ):
+                    logger.info("Bluestacks controller opened successfully.")
+                    self.bluestacks_state.transition_to(BluestacksState.LOADING)
+                    return
 
                 logger.error(
-                    f"Failed to find Bluestacks window after all attempts {attempt + 1}/{max_retries}"
+                    f"Failed to find Bluestacks window within {timeout_s} seconds ({max_retries} attempts)"
                 )
                 raise Exception(
-                    f"Failed to find Bluestacks window after all attempts {attempt + 1}/{max_retries}"
+                    f"Failed to find Bluestacks window within {timeout_s} seconds ({max_retries} attempts)"
                 )
             case BluestacksState.LOADING:
                 logger.info(
@@ -379,15 +451,52 @@ class BluePyllController(AdbDeviceTcp):
                         logger.debug("Bluestacks is ready")
                         return False
 
+    def get_boot_status(self) -> BootStatus | None:
+        """
+        Probe over ADB how far Android has booted, in a single shell call.
+
+        Returns:
+            BootStatus | None: The boot status, or None if ADB is not reachable yet
+        """
+        try:
+            if not self.connect_adb():
+                return None
+            output: str = self.shell(
+                BootStatus.command(), timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
+            )
+        except Exception as e:
+            logger.debug(f"Error probing boot status: {e}")
+            return None
+        status: BootStatus = BootStatus.from_output(output)
+        logger.debug(f"Boot status: {status}")
+        return status
+
     def wait_for_load(self):
         logger.debug("Waiting for Bluestacks to load...")
-        while self.bluestacks_state.current_state == BluestacksState.LOADING:
-            if self.is_bluestacks_loading():
+        start_time: float = time.time()
+
+        def finished_loading() -> bool:
+            if self.bluestacks_state.current_state != BluestacksState.LOADING:
+                return True
+            status: BootStatus | None = self.get_boot_status()
+            if status is not None:
+                if status.ready:
+                    self.bluestacks_state.transition_to(BluestacksState.READY)
+                    return True
                 logger.debug("Bluestacks is currently loading...")
-                # Wait a bit before checking again
-                time.sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
-            else:
-                logger.debug("Bluestacks is not loading")
+                return False
+            # Fall back to matching the loading screen if ADB stays unreachable
+            # (e.g. ADB is disabled in the BlueStacks settings)
+            if time.time() - start_time > BluestacksConstants.BOOT_PROBE_FALLBACK_S:
+                if self.is_bluestacks_loading():
+                    logger.debug("Bluestacks is currently loading...")
+            return self.bluestacks_state.current_state != BluestacksState.LOADING
+
+        wait_until(
+            finished_loading,
+            backoff=Backoff(max_s=BluestacksConstants.DEFAULT_WAIT_TIME),
+            label="wait_for_load",
+        )
         logger.info("Bluestacks is loaded & ready.")
 
     def kill_bluestacks(self) -> bool:
@@ -404,24 +513,26 @@ class BluePyllController(AdbDeviceTcp):
                 logger.debug("Bluestacks is already closed.")
                 return True
             case BluestacksState.LOADING | BluestacksState.READY:
+                self.stop_screen_stream()
+                self.stop_app_watcher()
                 try:
-                    for proc in psutil.process_iter(["pid", "name"]):
-                        info = proc.info
-                        if info["name"] == "HD-Player.exe":
-                            is_disconnected = self.disconnect_adb()
-                            if is_disconnected:
-                                proc.kill()
-                                proc.wait(
-                                    timeout=BluestacksConstants.PROCESS_WAIT_TIMEOUT
-                                )  # Wait for process to terminate
-                                self.bluestacks_state.transition_to(
-                                    BluestacksState.CLOSED
-                                )
-                                logger.info("Bluestacks controller killed.")
-                                return True
-                            else:
-                                raise ValueError("Failed to disconnect ADB device.")
-                    return False
+                    # Only scan the process table if no process is tracked
+                    if not (
+                        self.launcher.is_alive()
+                        or self.launcher.attach()
+                        or self.launcher.adopt()
+                    ):
+                        return False
+                    is_disconnected = self.disconnect_adb()
+                    if not is_disconnected:
+                        raise ValueError("Failed to disconnect ADB device.")
+                    if not self.launcher.kill(
+                        timeout_s=BluestacksConstants.PROCESS_WAIT_TIMEOUT
+                    ):
+                        return False
+                    self.bluestacks_state.transition_to(BluestacksState.CLOSED)
+                    logger.info("Bluestacks controller killed.")
+                    return True
                 except Exception as e:
                     logger.error(f"Error in kill_bluestacks: {e}")
                     raise ValueError(f"Failed to kill Bluestacks: {e}")
@@ -446,79 +557,101 @@ class BluePyllController(AdbDeviceTcp):
                     )
                     return
 
-                # Wait for app to open by checking if it's running
-                start_time: float = time.time()
-                while time.time() - start_time < timeout:
+                # Let the logcat watcher report the launch instead of polling
+                if self.app_watcher is not None and self.app_watcher.is_running:
+                    self.app_watcher.watch(app)
                     self.shell(
                         f"monkey -p {app.package_name} -v 1",
                         timeout_s=timeout,
                         read_timeout_s=timeout,
                         transport_timeout_s=timeout,
                     )
-                    match self.is_app_running(app):
-                        case True:
-                            app.app_state.transition_to(AppLifecycleState.LOADING)
-                            self.running_apps.append(app)
-                            print(f"{app.app_name.title()} app opened via ADB")
-                            return
-                        case False:
-                            time.sleep(wait_time)
+                    if self.app_watcher.wait_for_state(
+                        app,
+                        (AppLifecycleState.LOADING, AppLifecycleState.READY),
+                        timeout_s=timeout,
+                    ):
+                        logger.info(f"{app.app_name.title()} app opened via ADB")
+                    else:
+                        logger.warning(
+                            f"App {app.app_name.title()} did not start within {timeout} seconds"
+                        )
+                    return
+
+                # Wait for app to open by checking if it's running
+                self.shell(
+                    f"monkey -p {app.package_name} -v 1",
+                    timeout_s=timeout,
+                    read_timeout_s=timeout,
+                    transport_timeout_s=timeout,
+                )
+                match wait_until(
+                    lambda: self.is_app_running(app),
+                    deadline=timeout,
+                    backoff=Backoff(max_s=wait_time),
+                    label="open_app",
+                ):
+                    case True:
+                        app.app_state.transition_to(AppLifecycleState.LOADING)
+                        self.running_apps.append(app)
+                        logger.info(f"{app.app_name.title()} app opened via ADB")
+                        return
                 # If app isn't running after timeout, raise error
                 logger.warning(
                     f"App {app.app_name.title()} did not start within {timeout} seconds"
                 )
 
-    def is_app_running(self, app: BluePyllApp, max_retries: int = 3) -> bool:
+    def get_app_status(self, app: BluePyllApp) -> AppStatus | None:
         """
-        Check if an app is running.
+        Get an app's liveness and focus in a single shell call.
 
         Args:
             app: The app to check
 
         Returns:
-            bool: True if the app is running, False otherwise
+            AppStatus | None: The app's status, or None if it could not be checked
         """
-        # Ensure Bluestacks is ready before trying to check if app is running
+        # Ensure Bluestacks is ready before trying to check the app
         match self.bluestacks_state.current_state:
             case BluestacksState.CLOSED | BluestacksState.LOADING:
-                logger.warning(
-                    "Cannot check if app is running - Bluestacks is not ready"
-                )
-                return
+                logger.warning("Cannot check app status - Bluestacks is not ready")
+                return None
             case BluestacksState.READY:
                 is_connected = self.connect_adb()
                 if not is_connected:
                     logger.warning(
-                        "ADB device not connected. Skipping 'is_app_running' method call."
+                        "ADB device not connected. Skipping 'get_app_status' method call."
                     )
-                    return False
-
+                    return None
                 try:
-                    # Try multiple times to detect the app
-                    for i in range(max_retries):
-                        try:
-                            # Get the list of running processes with a longer timeout
-                            output: str = self.shell(
-                                f"dumpsys window windows | grep -E 'mCurrentFocus' | grep {app.package_name}",
-                                timeout_s=BluestacksConstants.APP_START_TIMEOUT,
-                            )
-                        except Exception as e:
-                            logger.debug(f"Error checking app process: {e}")
-                            time.sleep(
-                                BluestacksConstants.DEFAULT_WAIT_TIME
-                            )  # Wait a bit before retrying
-                        if output:
-                            logger.debug(f"Found app process: {output}")
-                            return True
-                        else:
-                            logger.debug(
-                                f"{app.app_name.title()} app process not found. Retrying... {i + 1}/{max_retries}"
-                            )
-                            time.sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
-                    return False
+                    output: str = self.shell(
+                        AppStatus.command(app.package_name),
+                        timeout_s=BluestacksConstants.DEFAULT_TIMEOUT,
+                    )
                 except Exception as e:
-                    logger.error(f"Error checking if app is running: {e}")
-                    return False
+                    logger.debug(f"Error checking app status: {e}")
+                    return None
+                status: AppStatus = AppStatus.from_output(app.package_name, output)
+                logger.debug(f"{app.app_name.title()} app status: {status}")
+                return status
+
+    def is_app_running(self, app: BluePyllApp, max_retries: int = 3) -> bool:
+        """
+        Check if an app is running in the foreground.
+
+        Args:
+            app: The app to check
+            max_retries: Number of attempts if the check itself fails
+
+        Returns:
+            bool: True if the app is running and focused, False otherwise
+        """
+        status: AppStatus | None = wait_until(
+            lambda: self.get_app_status(app),
+            max_attempts=max(int(max_retries), 1),
+            label="is_app_running",
+        )
+        return status is not None and status.running and status.focused
 
     def close_app(
         self,
@@ -540,24 +673,46 @@ class BluePyllController(AdbDeviceTcp):
                     )
                     return
 
-                start_time: float = time.time()
-                while time.time() - start_time < timeout:
+                # Let the logcat watcher report the process death instead of polling
+                if self.app_watcher is not None and self.app_watcher.is_running:
+                    self.app_watcher.watch(app)
                     self.shell(
                         f"am force-stop {app.package_name}",
                         timeout_s=BluestacksConstants.DEFAULT_TIMEOUT,
                     )
-                    match self.is_app_running(app):
-                        case True:
-                            time.sleep(wait_time)
-                        case False:
-                            app.app_state.transition_to(AppLifecycleState.CLOSED)
-                            self.running_apps = [
-                                existing_app
-                                for existing_app in self.running_apps
-                                if existing_app != app
-                            ]
-                            print(f"{app.app_name.title()} app closed via ADB")
-                            return
+                    if self.app_watcher.wait_for_state(
+                        app, (AppLifecycleState.CLOSED,), timeout_s=timeout
+                    ):
+                        logger.info(f"{app.app_name.title()} app closed via ADB")
+                    else:
+                        logger.warning(
+                            f"App {app.app_name.title()} did not close within {timeout} seconds"
+                        )
+                    return
+
+                def is_closed() -> bool:
+                    status: AppStatus | None = self.get_app_status(app)
+                    return status is not None and not status.running
+
+                self.shell(
+                    f"am force-stop {app.package_name}",
+                    timeout_s=BluestacksConstants.DEFAULT_TIMEOUT,
+                )
+                match wait_until(
+                    is_closed,
+                    deadline=timeout,
+                    backoff=Backoff(max_s=wait_time),
+                    label="close_app",
+                ):
+                    case True:
+                        app.app_state.transition_to(AppLifecycleState.CLOSED)
+                        self.running_apps = [
+                            existing_app
+                            for existing_app in self.running_apps
+                            if existing_app != app
+                        ]
+                        logger.info(f"{app.app_name.title()} app closed via ADB")
+                        return
                 # If app is still running after timeout, raise error
                 logger.warning(
                     f"App {app.app_name.title()} did not close within {timeout} seconds"
@@ -578,18 +733,53 @@ class BluePyllController(AdbDeviceTcp):
                     )
                     return
                 # Go to home screen
-                self.shell(
-                    "input keyevent 3", timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
-                )
+                self.send_input("input keyevent 3")
                 logger.debug("Home screen opened via ADB")
 
-    def capture_screenshot(self) -> bytes | None:
+    def capture_screenshot(self, raw: bool | None = None) -> bytes | np.ndarray | None:
+        """
+        Capture a screenshot of the emulator screen via ADB.
+
+        Captures are shared through 'screenshot_cache' for 'screenshot_cache_ttl_s'
+        seconds, so several element lookups against one screen cost one capture.
+
+        Args:
+            raw (bool | None): If True, capture the raw framebuffer ('screencap' without '-p')
+                and return an RGBA array view over the received bytes, skipping PNG encoding
+                on the device and decoding on the host. Defaults to 'raw_screenshots'.
+
+        Returns:
+            bytes | np.ndarray | None: PNG bytes, an RGBA array in raw mode (the latest
+                streamed frame while a screen stream is running), or None on failure
+        """
+        raw = self.raw_screenshots if raw is None else raw
         # Ensure Bluestacks is ready before trying to capture screenshot
         match self.bluestacks_state.current_state:
             case BluestacksState.CLOSED | BluestacksState.LOADING:
                 logger.warning("Cannot capture screenshot - Bluestacks is not ready")
                 return
             case BluestacksState.READY:
+                # Queued input must land before the screen is captured
+                self.input_queue.flush()
+                # Serve the latest streamed frame to raw captures when a screen stream is running
+                if (
+                    raw
+                    and self.screen_stream is not None
+                    and self.screen_stream.is_running
+                ):
+                    frame: np.ndarray | None = self.screen_stream.latest_frame(
+                        timeout_s=BluestacksConstants.DEFAULT_WAIT_TIME
+                    )
+                    if frame is not None:
+                        return frame
+                    logger.debug(
+                        "No streamed frame available, falling back to screencap"
+                    )
+                cached_screenshot: bytes | np.ndarray | None = (
+                    self.screenshot_cache.get(raw)
+                )
+                if cached_screenshot is not None:
+                    return cached_screenshot
                 # Ensure ADB connection is established
                 is_connected = self.connect_adb()
                 if not is_connected:
@@ -599,43 +789,223 @@ class BluePyllController(AdbDeviceTcp):
                     return None
                 try:
                     # Capture the screenshot
-                    screenshot_bytes: bytes = self.shell(
-                        "screencap -p",
+                    screenshot_bytes: bytes = self.bulk_shell(
+                        "screencap" if raw else "screencap -p",
                         decode=False,
                         timeout_s=BluestacksConstants.DEFAULT_TIMEOUT,
                     )
-
-                    return screenshot_bytes
+                    screenshot: bytes | np.ndarray = (
+                        parse_raw_screencap(screenshot_bytes)
+                        if raw
+                        else screenshot_bytes
+                    )
+                    self.screenshot_cache.put(screenshot, raw)
+                    return screenshot
                 except Exception as e:
                     logger.error(f"Error capturing screenshot: {e}")
                     return None
 
+    def start_screen_stream(
+        self,
+        max_frames: int = 4,
+        bit_rate: int = 8_000_000,
+        size: tuple[int, int] | None = None,
+    ) -> ScreenRecordStream:
+        """
+        Start a continuous 'screenrecord' frame stream.
+
+        While the stream is running, raw captures ('capture_screenshot' with 'raw'
+        or 'raw_screenshots') return the latest streamed frame instead of issuing
+        a 'screencap' per call; PNG captures are unaffected.
+
+        Args:
+            max_frames (int): Number of recent frames kept in the ring
+            bit_rate (int): Encoder bit rate passed to 'screenrecord'
+            size (tuple[int, int] | None): Optional encode size passed to 'screenrecord'
+
+        Returns:
+            ScreenRecordStream: The running stream
+        """
+        self.stop_screen_stream()
+        self.screen_stream = ScreenRecordStream(
+            self, max_frames=max_frames, bit_rate=bit_rate, size=size
+        )
+        self.screen_stream.start()
+        return self.screen_stream
+
+    def stop_screen_stream(self) -> None:
+        """Stop the screen stream if one is running."""
+        if self.screen_stream is not None:
+            self.screen_stream.stop()
+            self.screen_stream = None
+
+    def start_app_watcher(self, apps: list[BluePyllApp] | None = None) -> LogcatWatcher:
+        """
+        Start following 'logcat' to drive app lifecycle states from system events.
+
+        While the watcher is running, 'open_app' and 'close_app' wait for the
+        matching log event instead of polling the app's status.
+
+        Args:
+            apps (list[BluePyllApp] | None): Apps to watch, in addition to the running apps
+
+        Returns:
+            LogcatWatcher: The running watcher
+        """
+        self.stop_app_watcher()
+        self.app_watcher = LogcatWatcher(self, [*self.running_apps, *(apps or [])])
+        self.app_watcher.start()
+        return self.app_watcher
+
+    def stop_app_watcher(self) -> None:
+        """Stop the logcat app watcher if one is running."""
+        if self.app_watcher is not None:
+            self.app_watcher.stop()
+            self.app_watcher = None
+
+    def latest_frame(self) -> np.ndarray | None:
+        """
+        Get the latest streamed frame, if a screen stream is running.
+
+        Returns:
+            np.ndarray | None: A (height, width, 4) RGBA array, or None
+        """
+        if self.screen_stream is None:
+            return None
+        return self.screen_stream.latest_frame()
+
+    def locate_many(
+        self,
+        ui_elements: list[BluePyllElement],
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
+    ) -> list[Match | None]:
+        """
+        Look for many elements in one frame, decoded once and matched in parallel.
+
+        Args:
+            ui_elements (list[BluePyllElement]): The elements to look for
+            screenshot_img_bytes (bytes | np.ndarray | None): A frame to search instead of capturing one
+
+        Returns:
+            list[Match | None]: The match (location and score) of each element, in order
+        """
+        screen_image: bytes | np.ndarray | None = (
+            screenshot_img_bytes
+            if screenshot_img_bytes is not None
+            else self.capture_screenshot()
+        )
+        if screen_image is None or not len(screen_image):
+            logger.warning("Cannot locate elements - no screenshot")
+            return [None] * len(ui_elements)
+        return locate_many(ui_elements, screen_image)
+
+    def _find_first_element(
+        self,
+        ui_elements: list[BluePyllElement],
+        screenshot_img_bytes: bytes | np.ndarray | None,
+        max_tries: int,
+    ) -> tuple[BluePyllElement, tuple[int, int]] | None:
+        """Find the first of several elements on screen, matching them all on each frame."""
+        if self.bluestacks_state.current_state == BluestacksState.CLOSED:
+            logger.warning("Cannot find UI elements - Bluestacks is closed")
+            return None
+
+        def find_ui_elements() -> tuple[BluePyllElement, tuple[int, int]] | None:
+            matches: list[Match | None] = [None] * len(ui_elements)
+            try:
+                if screenshot_img_bytes is not None:
+                    matches = locate_many(ui_elements, screenshot_img_bytes)
+                else:
+                    # The loading image is matched against the window capture, as in 'where'
+                    loading_path = self.elements.bluestacks_loading_img.path
+                    loading: list[int] = [
+                        i
+                        for i, ui_element in enumerate(ui_elements)
+                        if ui_element.path == loading_path
+                    ]
+                    others: list[int] = [
+                        i for i in range(len(ui_elements)) if i not in loading
+                    ]
+                    for capture, indices in (
+                        (self._capture_loading_screen, loading),
+                        (self.capture_screenshot, others),
+                    ):
+                        if not indices:
+                            continue
+                        screen_image: bytes | np.ndarray | None = capture()
+                        if screen_image is None or not len(screen_image):
+                            continue
+                        for i, match in zip(
+                            indices,
+                            locate_many(
+                                [ui_elements[i] for i in indices], screen_image
+                            ),
+                        ):
+                            matches[i] = match
+            except TcpTimeoutException as e:
+                logger.debug(f"Timed out capturing screenshot: {e}")
+                return None
+            for ui_element, match in zip(ui_elements, matches):
+                if match is not None:
+                    logger.debug(
+                        f"BluePyllElement {ui_element.label} found at: {match}"
+                    )
+                    return ui_element, match.center
+            return None
+
+        # A provided screenshot never changes, so it is only searched once
+        return wait_until(
+            find_ui_elements,
+            backoff=Backoff.fixed(BluestacksConstants.DEFAULT_WAIT_TIME),
+            max_attempts=(
+                1
+                if screenshot_img_bytes is not None
+                else max_tries if max_tries is not None and max_tries > 0 else None
+            ),
+            label="where_elements",
+        )
+
     def where_elements(
         self,
         ui_elements: list[BluePyllElement],
-        screenshot_img_bytes: bytes = None,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
         max_tries: int = 2,
     ) -> tuple[int, int] | None:
-        coord: tuple[int, int] | None = None
-        for ui_element in ui_elements:
-            coord = ui_element.where(
-                bluepyll_controller=self,
-                screenshot_img_bytes=screenshot_img_bytes,
-                max_retries=max_tries,
-            )
-            if coord:
-                return coord
+        if self.match_backend != "opencv":
+            coord: tuple[int, int] | None = None
+            for ui_element in ui_elements:
+                coord = ui_element.where(
+                    screenshot_img_bytes=screenshot_img_bytes,
+                    max_retries=max_tries,
+                )
+                if coord:
+                    return coord
+            return None
+        found = self._find_first_element(ui_elements, screenshot_img_bytes, max_tries)
+        return found[1] if found else None
 
     def click_elements(
         self,
         ui_elements: list[BluePyllElement],
-        screenshot_img_bytes: bytes = None,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
         max_tries: int = 2,
     ) -> bool:
-        return any(
-            ui_element.click(screenshot_img_bytes=screenshot_img_bytes, max_tries=max_tries)
-            for ui_element in ui_elements
-        )
+        if self.match_backend != "opencv":
+            return any(
+                ui_element.click(
+                    screenshot_img_bytes=screenshot_img_bytes, max_tries=max_tries
+                )
+                for ui_element in ui_elements
+            )
+        if self.bluestacks_state.current_state != BluestacksState.READY:
+            logger.warning("Cannot click UI elements - Bluestacks is not ready")
+            return False
+        found = self._find_first_element(ui_elements, screenshot_img_bytes, max_tries)
+        if not found:
+            logger.debug("None of the UI elements were found")
+            return False
+        ui_element, coord = found
+        return ui_element.click_coord(coord)
 
     def type_text(self, text: str) -> None:
         # Ensure Bluestacks is ready before trying to type text
@@ -651,9 +1021,7 @@ class BluePyllController(AdbDeviceTcp):
                     )
                     return
                 # Send the text using ADB
-                self.shell(
-                    f"input text {text}", timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
-                )
+                self.send_input(f"input text {text}")
                 logger.debug(f"Text '{text}' sent via ADB")
 
     def press_enter(self) -> None:
@@ -670,9 +1038,7 @@ class BluePyllController(AdbDeviceTcp):
                     )
                     return
                 # Send the enter key using ADB
-                self.shell(
-                    "input keyevent 66", timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
-                )
+                self.send_input("input keyevent 66")
                 logger.debug("Enter key sent via ADB")
 
     def press_esc(self) -> None:
@@ -689,11 +1055,111 @@ class BluePyllController(AdbDeviceTcp):
                     )
                     return
                 # Send the esc key using ADB
-                self.shell(
-                    "input keyevent 4", timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
-                )
+                self.send_input("input keyevent 4")
                 logger.debug("Esc key sent via ADB")
 
+    def shell(
+        self,
+        command: str,
+        transport_timeout_s: float | None = None,
+        read_timeout_s: float = DEFAULT_READ_TIMEOUT_S,
+        timeout_s: float | None = None,
+        decode: bool = True,
+    ) -> str | bytes:
+        """
+        Run a shell command on the device.
+
+        When 'use_shell_session' is enabled, text commands are written to the
+        persistent shell session instead of opening a new ADB stream per command.
+        Binary commands ('decode=False') always use a one-shot ADB stream.
+        Input commands invalidate the screenshot cache, and any queued input
+        commands are flushed first.
+
+        Args:
+            command (str): The shell command to run
+            transport_timeout_s (float | None): Timeout for sending and receiving data
+            read_timeout_s (float): Time to wait for a response packet
+            timeout_s (float | None): Time to wait for the command to finish
+            decode (bool): Whether to decode the output to a string
+
+        Returns:
+            str | bytes: The command output
+        """
+        # Send queued input first so commands run in the order they were issued
+        self.input_queue.flush()
+        try:
+            if self.use_shell_session and decode:
+                try:
+                    return self._shell_session.run(command, timeout_s=timeout_s)
+                except Exception as e:
+                    logger.warning(
+                        f"Persistent shell session failed, falling back to one-shot shell: {e}"
+                    )
+            return super().shell(
+                command,
+                transport_timeout_s=transport_timeout_s,
+                read_timeout_s=read_timeout_s,
+                timeout_s=timeout_s,
+                decode=decode,
+            )
+        finally:
+            if command.lstrip().startswith(
+                BluestacksConstants.SCREEN_MUTATING_COMMANDS
+            ):
+                self.screenshot_cache.invalidate()
+
+    def send_input(self, command: str) -> None:
+        """
+        Send an input command (tap, key event or text).
+
+        While the input queue is active the command is queued and sent later with
+        the rest of the batch; otherwise it is sent immediately.
+
+        Args:
+            command (str): The input shell command
+        """
+        if self.input_queue.active:
+            self.input_queue.enqueue(command)
+            return
+        self.shell(command, timeout_s=BluestacksConstants.DEFAULT_TIMEOUT)
+
+    def batch_input(self) -> AbstractContextManager[InputQueue]:
+        """
+        Queue every input command issued inside a 'with' block and send them as
+        one shell invocation when the block ends.
+
+        Returns:
+            AbstractContextManager[InputQueue]: The batching context
+        """
+        return self.input_queue.batch()
+
+    def flush_input(self) -> None:
+        """Send all queued input commands now."""
+        self.input_queue.flush()
+
+    def bulk_shell(self, command: str, **kwargs) -> str | bytes:
+        """
+        Run a bulk-transfer shell command (e.g. a screenshot).
+
+        Uses a pooled connection when 'bulk_connections' is set, so the transfer
+        never delays input commands on the controller's own connection. If no
+        pooled connection frees up within 'POOL_ACQUIRE_TIMEOUT_S', the
+        controller's own connection is used instead.
+
+        Args:
+            command (str): The shell command to run
+            **kwargs: Additional arguments passed to 'shell'
+
+        Returns:
+            str | bytes: The command output
+        """
+        if self.connection_pool.size > 0:
+            try:
+                return self.connection_pool.shell(command, **kwargs)
+            except TimeoutError as e:
+                logger.debug(f"{e}, using the main connection")
+        return self.shell(command, **kwargs)
+
     def connect_adb(self) -> bool:
         match self.available:
             case True:
@@ -702,9 +1168,13 @@ class BluePyllController(AdbDeviceTcp):
                 logger.debug(
                     "ADB device not connected. Attempting to Connect ADB device..."
                 )
+                self._shell_session.close()
                 self.connect()
-                time.sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
-                match self.available:
+                match wait_until(
+                    lambda: self.available,
+                    deadline=BluestacksConstants.DEFAULT_WAIT_TIME,
+                    label="connect_adb",
+                ):
                     case True:
                         logger.debug("ADB device connected.")
                         return True
@@ -720,13 +1190,18 @@ class BluePyllController(AdbDeviceTcp):
                 logger.debug(
                     "ADB device is connected. Attempting to disconnect ADB device..."
                 )
+                self._shell_session.close()
+                self.connection_pool.close()
                 self.close()
-                time.sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
-                match self.available:
-                    case True:
+                match wait_until(
+                    lambda: not self.available,
+                    deadline=BluestacksConstants.DEFAULT_WAIT_TIME,
+                    label="disconnect_adb",
+                ):
+                    case False:
                         logger.debug("ADB device not disconnected.")
                         return False
-                    case False:
+                    case True:
                         logger.debug("ADB device disconnected.")
                         return True
 
@@ -738,8 +1213,5 @@ class BluePyllController(AdbDeviceTcp):
                 logger.warning("Cannot show recent apps - Bluestacks is not ready")
                 return
             case BluestacksState.READY:
-                self.shell(
-                    "input keyevent KEYCODE_APP_SWITCH",
-                    timeout_s=BluestacksConstants.DEFAULT_TIMEOUT,
-                )
+                self.send_input("input keyevent KEYCODE_APP_SWITCH")
                 logger.debug("Recent apps drawer successfully opened")
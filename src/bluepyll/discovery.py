@@ -0,0 +1,149 @@
+"""
+BlueStacks installation discovery for BluePyll
+"""
+
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from threading import Event, Lock
+
+from .constants import BluestacksConstants
+
+logger = logging.getLogger(__name__)
+
+HD_PLAYER_FILENAME: str = "HD-Player.exe"
+
+# Controllers created together all cache the path they found
+_cache_lock: Lock = Lock()
+
+
+def _default_cache_file() -> Path:
+    return Path(BluestacksConstants.USER_STATE_DIR, "config.json")
+
+
+def load_cached_path(cache_file: str | Path | None = None) -> str | None:
+    """
+    Load the cached HD-Player.exe path, if it is still valid.
+
+    The cached entry is only trusted if the file still exists with the same mtime.
+
+    Args:
+        cache_file (str | Path | None): The JSON config file (default: 'config.json' in 'USER_STATE_DIR')
+
+    Returns:
+        str | None: The cached path, or None if there is no valid entry
+    """
+    cache_file = Path(cache_file) if cache_file is not None else _default_cache_file()
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            entry = json.load(f).get("hd_player", {})
+        path: str = entry["path"]
+        if os.path.isfile(path) and os.path.getmtime(path) == entry["mtime"]:
+            return path
+        logger.debug(f"Cached HD-Player.exe path is stale: {path}")
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return None
+
+
+def save_cached_path(path: str, cache_file: str | Path | None = None) -> None:
+    """
+    Cache a discovered HD-Player.exe path together with its mtime.
+
+    Args:
+        path (str): The path to HD-Player.exe
+        cache_file (str | Path | None): The JSON config file (default: 'config.json' in 'USER_STATE_DIR')
+    """
+    cache_file = Path(cache_file) if cache_file is not None else _default_cache_file()
+    with _cache_lock:
+        try:
+            try:
+                with open(cache_file, encoding="utf-8") as f:
+                    config = json.load(f)
+                if not isinstance(config, dict):
+                    config = {}
+            except (OSError, ValueError):
+                config = {}
+            config["hd_player"] = {"path": path, "mtime": os.path.getmtime(path)}
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Unique per write, so concurrent writers never share a temp file
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=cache_file.parent,
+                prefix=f"{cache_file.stem}.",
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                json.dump(config, f)
+            try:
+                os.replace(f.name, cache_file)
+            except OSError:
+                os.unlink(f.name)
+                raise
+        except OSError as e:
+            logger.debug(f"Could not cache HD-Player.exe path: {e}")
+
+
+def _search_root(root: str, max_depth: int, stop_event: Event) -> str | None:
+    """Breadth-first search of one root for HD-Player.exe inside a BlueStacks folder."""
+    queue: deque[tuple[str, int]] = deque([(root, 0)])
+    while queue and not stop_event.is_set():
+        directory, depth = queue.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if stop_event.is_set():
+                        return None
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth < max_depth:
+                                queue.append((entry.path, depth + 1))
+                        elif (
+                            entry.name == HD_PLAYER_FILENAME
+                            and "bluestacks" in directory.lower()
+                        ):
+                            return entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return None
+
+
+def search_for_hd_player(
+    roots: list[str],
+    max_depth: int = BluestacksConstants.PATH_SEARCH_MAX_DEPTH,
+) -> str | None:
+    """
+    Search several roots in parallel for HD-Player.exe, stopping at the first hit.
+
+    Args:
+        roots (list[str]): The directories to search
+        max_depth (int): How many directory levels below each root to search
+
+    Returns:
+        str | None: The path to HD-Player.exe, or None if it was not found
+    """
+    roots = list(dict.fromkeys(root for root in roots if root and os.path.isdir(root)))
+    if not roots:
+        return None
+    stop_event: Event = Event()
+    with ThreadPoolExecutor(
+        max_workers=len(roots), thread_name_prefix="bluepyll-discovery"
+    ) as pool:
+        pending = {
+            pool.submit(_search_root, root, max_depth, stop_event) for root in roots
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path: str | None = future.result()
+                if path:
+                    stop_event.set()
+                    return path
+    return None
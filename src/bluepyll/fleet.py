@@ -0,0 +1,244 @@
+"""
+Multi-instance fleet management for BluePyll
+"""
+
+import copy
+import logging
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from queue import Queue
+from threading import Lock
+from typing import Any
+
+import numpy as np
+
+from .app import BluePyllApp
+from .constants import BluestacksConstants
+from .controller import BluePyllController
+from .ocr_server import OcrServer
+from .ui import BluePyllElement
+
+logger = logging.getLogger(__name__)
+
+
+def _locate_in_process(
+    element: BluePyllElement, screen_image: bytes | np.ndarray
+) -> tuple[int, int] | None:
+    """Run 'BluePyllElement.locate' in a vision worker process."""
+    return element.locate(screen_image)
+
+
+class BluePyllFleet:
+    """
+    Manages many BlueStacks instances, one BluePyllController per ADB port.
+
+    Jobs are callables that take a controller; each one is dispatched to a free
+    instance through a worker pool with one thread per instance, so ADB I/O on
+    different instances runs concurrently. CPU-bound vision work can be sent to
+    a process pool with 'locate', so matching on many instances is spread across
+    cores instead of serialising on one interpreter lock.
+
+    Attributes:
+        controllers (dict[int, BluePyllController]): The controllers, keyed by ADB port
+    """
+
+    def __init__(
+        self,
+        controllers: list[BluePyllController],
+        vision_workers: int | None = None,
+        ocr_server: OcrServer | None = None,
+    ) -> None:
+        """
+        Initialize a BluePyllFleet.
+
+        Args:
+            controllers (list[BluePyllController]): The controllers to manage
+            vision_workers (int | None): Number of vision worker processes (default: one per core)
+            ocr_server (OcrServer | None): A shared OCR server to stop with the fleet
+        """
+        if not controllers:
+            raise ValueError("controllers must be a non-empty list")
+        self.controllers: dict[int, BluePyllController] = {
+            controller.port: controller for controller in controllers
+        }
+        self._free_controllers: Queue[BluePyllController] = Queue()
+        for controller in controllers:
+            self._free_controllers.put(controller)
+        self._job_pool: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=len(controllers), thread_name_prefix="bluepyll-fleet"
+        )
+        self._vision_workers: int | None = vision_workers
+        self._vision_pool: ProcessPoolExecutor | None = None
+        self._vision_pool_lock: Lock = Lock()
+        self.ocr_server: OcrServer | None = ocr_server
+
+    @classmethod
+    def from_ports(
+        cls,
+        ports: list[int] | list[tuple[int, str | None]] | dict[int, str | None],
+        ip: str = BluestacksConstants.DEFAULT_IP,
+        vision_workers: int | None = None,
+        shared_ocr: bool = False,
+        **controller_kwargs,
+    ) -> "BluePyllFleet":
+        """
+        Create a fleet with one BluePyllController per ADB port.
+
+        Controllers are constructed in parallel. To run several BlueStacks
+        instances at once, give each port the name of the instance that serves
+        it, so each controller launches and adopts its own HD-Player.
+
+        Args:
+            ports (list[int] | list[tuple[int, str | None]] | dict[int, str | None]):
+                The ADB ports of the instances, as ports, (port, instance) pairs
+                or a port to instance mapping; a missing instance is the default one
+            ip (str): The ADB IP address of the instances
+            vision_workers (int | None): Number of vision worker processes (default: one per core)
+            shared_ocr (bool): Serve OCR for every controller from one OcrServer process
+            **controller_kwargs: Additional arguments passed to each BluePyllController
+
+        Returns:
+            BluePyllFleet: The new fleet
+        """
+        if not ports:
+            raise ValueError("ports must be a non-empty list")
+        targets: list[tuple[int, str | None]] = (
+            list(ports.items())
+            if isinstance(ports, dict)
+            else [port if isinstance(port, tuple) else (port, None) for port in ports]
+        )
+        ocr_server: OcrServer | None = None
+        if shared_ocr:
+            ocr_server = OcrServer()
+            ocr_server.start()
+
+        def create_controller(target: tuple[int, str | None]) -> BluePyllController:
+            port, instance = target
+            kwargs: dict = dict(controller_kwargs)
+            if ocr_server is not None:
+                # One client per controller, so their requests can share a batch
+                kwargs["img_txt_checker"] = ocr_server.client()
+            return BluePyllController(ip=ip, port=port, instance=instance, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            controllers: list[BluePyllController] = list(
+                pool.map(create_controller, targets)
+            )
+        return cls(controllers, vision_workers=vision_workers, ocr_server=ocr_server)
+
+    def __len__(self) -> int:
+        return len(self.controllers)
+
+    def __enter__(self) -> "BluePyllFleet":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+    def _run_job(
+        self, job: Callable[..., Any], args: tuple, kwargs: dict[str, Any]
+    ) -> Any:
+        controller: BluePyllController = self._free_controllers.get()
+        try:
+            logger.debug(f"Running fleet job on instance at port {controller.port}")
+            return job(controller, *args, **kwargs)
+        finally:
+            self._free_controllers.put(controller)
+
+    def submit(self, job: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Run a job on the next free instance.
+
+        Args:
+            job (Callable[..., Any]): Called as 'job(controller, *args, **kwargs)'
+            *args: Additional positional arguments for the job
+            **kwargs: Additional keyword arguments for the job
+
+        Returns:
+            Future: Resolves to the job's return value
+        """
+        return self._job_pool.submit(self._run_job, job, args, kwargs)
+
+    def map(self, job: Callable[..., Any], *iterables) -> list[Any]:
+        """
+        Run a job once per item across free instances and wait for all results.
+
+        Args:
+            job (Callable[..., Any]): Called as 'job(controller, *items)'
+            *iterables: Iterables providing the job's additional arguments
+
+        Returns:
+            list[Any]: The job results, in input order
+        """
+        futures: list[Future] = [self.submit(job, *items) for items in zip(*iterables)]
+        return [future.result() for future in futures]
+
+    def states(self) -> dict[int, Enum]:
+        """
+        Get the BlueStacks state of every instance.
+
+        Returns:
+            dict[int, Enum]: The current 'BluestacksState' of each instance, keyed by ADB port
+        """
+        return {
+            port: controller.bluestacks_state.current_state
+            for port, controller in self.controllers.items()
+        }
+
+    def running_apps(self) -> dict[int, list[BluePyllApp]]:
+        """
+        Get the running apps of every instance.
+
+        Returns:
+            dict[int, list[BluePyllApp]]: The running apps of each instance, keyed by ADB port
+        """
+        return {
+            port: list(controller.running_apps)
+            for port, controller in self.controllers.items()
+        }
+
+    def locate(
+        self, element: BluePyllElement, screen_image: bytes | np.ndarray
+    ) -> Future:
+        """
+        Locate an element in a frame in a vision worker process.
+
+        Args:
+            element (BluePyllElement): The element to look for
+            screen_image (bytes | np.ndarray): The frame to search
+
+        Returns:
+            Future: Resolves to the coords of the center of the element, or None if not found
+        """
+        with self._vision_pool_lock:
+            if self._vision_pool is None:
+                self._vision_pool = ProcessPoolExecutor(
+                    max_workers=self._vision_workers
+                )
+        # The controller holds sockets and locks, so it is not sent to the worker
+        detached_element: BluePyllElement = copy.copy(element)
+        detached_element.controller = None
+        return self._vision_pool.submit(
+            _locate_in_process, detached_element, screen_image
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the job and vision pools, and the shared OCR server if there is one.
+
+        Args:
+            wait (bool): Whether to wait for pending jobs to finish
+        """
+        self._job_pool.shutdown(wait=wait)
+        with self._vision_pool_lock:
+            if self._vision_pool is not None:
+                self._vision_pool.shutdown(wait=wait)
+                self._vision_pool = None
+        if self.ocr_server is not None:
+            for controller in self.controllers.values():
+                close = getattr(controller.img_txt_checker, "close", None)
+                if close is not None:
+                    close()
+            self.ocr_server.stop()
+            self.ocr_server = None
@@ -0,0 +1,333 @@
+"""
+Screen frame helpers for BluePyll
+"""
+
+import hashlib
+import struct
+import time
+from collections.abc import Hashable
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+from PIL import Image
+
+from .constants import BluestacksConstants
+
+# Pixel formats reported in the raw 'screencap' header (android.graphics.PixelFormat)
+RGBA_8888: int = 1
+RGBX_8888: int = 2
+BGRA_8888: int = 5
+
+_SUPPORTED_PIXEL_FORMATS: tuple[int, ...] = (RGBA_8888, RGBX_8888, BGRA_8888)
+
+
+def parse_raw_screencap(data: bytes | bytearray | memoryview) -> np.ndarray:
+    """
+    Parse the output of a plain (non-PNG) 'screencap' into an RGBA array.
+
+    The output starts with a little-endian header of width, height and pixel
+    format (plus a colorspace field on Android 9+), followed by the pixel rows.
+    For RGBA/RGBX frames the returned array is a view over the received buffer,
+    so no pixel data is copied.
+
+    Args:
+        data (bytes | bytearray | memoryview): Raw 'screencap' output
+
+    Returns:
+        np.ndarray: A (height, width, 4) uint8 array of RGBA pixels
+
+    Raises:
+        ValueError: If the header is invalid or the pixel format is unsupported
+    """
+    if len(data) < 12:
+        raise ValueError("Raw screencap output is too short to contain a header")
+
+    width, height, pixel_format = struct.unpack_from("<III", data, 0)
+    if pixel_format not in _SUPPORTED_PIXEL_FORMATS:
+        raise ValueError(f"Unsupported screencap pixel format: {pixel_format}")
+
+    pixels_size: int = width * height * 4
+    header_size: int = len(data) - pixels_size
+    if header_size not in (12, 16):
+        raise ValueError(
+            f"Raw screencap size mismatch: {len(data)} bytes for {width}x{height}"
+        )
+
+    frame: np.ndarray = np.frombuffer(
+        data, dtype=np.uint8, count=pixels_size, offset=header_size
+    ).reshape(height, width, 4)
+    if pixel_format == BGRA_8888:
+        frame = frame[..., [2, 1, 0, 3]]
+    return frame
+
+
+def frame_to_image(frame: np.ndarray | bytes | str | Path | Image.Image) -> Image.Image:
+    """
+    Convert any supported screen frame to a PIL Image.
+
+    Args:
+        frame (np.ndarray | bytes | str | Path | Image.Image): An RGBA/RGB array,
+            encoded image bytes, an image path or a PIL Image
+
+    Returns:
+        Image.Image: The frame as a PIL Image
+
+    Raises:
+        ValueError: If the frame type is unsupported
+    """
+    if isinstance(frame, Image.Image):
+        return frame
+    if isinstance(frame, np.ndarray):
+        mode: str = "RGBA" if frame.ndim == 3 and frame.shape[2] == 4 else "RGB"
+        if frame.ndim == 2:
+            mode = "L"
+        frame = np.ascontiguousarray(frame)
+        height, width = frame.shape[:2]
+        return Image.frombuffer(mode, (width, height), frame, "raw", mode, 0, 1)
+    if isinstance(frame, bytes):
+        return Image.open(BytesIO(frame))
+    if isinstance(frame, (str, Path)):
+        return Image.open(frame)
+    raise ValueError(f"Unsupported frame type: {type(frame).__name__}")
+
+
+def frame_size(frame: np.ndarray | bytes | str | Path | Image.Image) -> tuple[int, int]:
+    """
+    Get the (width, height) of a screen frame without decoding arrays.
+
+    Args:
+        frame (np.ndarray | bytes | str | Path | Image.Image): The screen frame
+
+    Returns:
+        tuple[int, int]: The frame width and height
+    """
+    if isinstance(frame, np.ndarray):
+        return int(frame.shape[1]), int(frame.shape[0])
+    return frame_to_image(frame).size
+
+
+class FrameCache:
+    """
+    A time-bounded cache of the most recent screen capture.
+
+    Lets several element lookups against the same screen share one capture.
+    Entries expire after 'ttl_s' seconds and the cache is invalidated whenever
+    an input command may have changed the screen.
+
+    Attributes:
+        ttl_s (float): Freshness window in seconds; 0 disables caching
+        hits (int): Number of captures served from the cache
+        misses (int): Number of captures that had to hit the device
+    """
+
+    def __init__(self, ttl_s: float = 0.0) -> None:
+        """
+        Initialize a FrameCache.
+
+        Args:
+            ttl_s (float): Freshness window in seconds; 0 disables caching
+        """
+        if ttl_s < 0:
+            raise ValueError("ttl_s must be a non-negative number")
+        self.ttl_s: float = float(ttl_s)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: dict[Hashable, tuple[float, np.ndarray | bytes]] = {}
+        self._lock: Lock = Lock()
+
+    def get(self, key: Hashable = None) -> np.ndarray | bytes | None:
+        """
+        Get a cached frame if it is still fresh.
+
+        Args:
+            key (Hashable): Identifies the capture kind (e.g. raw vs PNG)
+
+        Returns:
+            np.ndarray | bytes | None: The cached frame, or None on a miss
+        """
+        if self.ttl_s <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_s:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, frame: np.ndarray | bytes, key: Hashable = None) -> None:
+        """
+        Store a freshly captured frame.
+
+        Args:
+            frame (np.ndarray | bytes): The captured frame
+            key (Hashable): Identifies the capture kind (e.g. raw vs PNG)
+        """
+        if self.ttl_s <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), frame)
+
+    def invalidate(self) -> None:
+        """Drop all cached frames."""
+        with self._lock:
+            self._entries.clear()
+
+
+class DirtyTileTracker:
+    """
+    Tracks which tiles of the screen changed between processed frames.
+
+    Each frame passed to 'update' is split into square tiles and every tile is
+    hashed. Tiles whose hash differs from the previous frame are reported in
+    'changed_tiles', and every tile remembers the generation (update count) it
+    last changed in, so a cached result for any region can be checked with
+    'changed_since' instead of recomputing it. Passing the captured frame as
+    'source' makes repeated updates with the same frame a no-op, so many
+    lookups on one frame count as a single generation.
+
+    Attributes:
+        tile_size (int): Width and height of a tile, in pixels
+        generation (int): Number of frames processed so far
+        changed_tiles (set[tuple[int, int]]): (column, row) of the tiles changed by the last frame
+    """
+
+    def __init__(self, tile_size: int = BluestacksConstants.DIRTY_TILE_SIZE) -> None:
+        """
+        Initialize a DirtyTileTracker.
+
+        Args:
+            tile_size (int): Width and height of a tile, in pixels
+        """
+        if tile_size < 1:
+            raise ValueError("tile_size must be a positive integer")
+        self.tile_size: int = int(tile_size)
+        self.generation: int = 0
+        self.changed_tiles: set[tuple[int, int]] = set()
+        self._frame_size: tuple[int, int] | None = None
+        self._hashes: list[list[bytes]] = []
+        self._changed_at: np.ndarray = np.zeros((0, 0), dtype=np.int64)
+        self._source: object | None = None
+        self._lock: Lock = Lock()
+
+    def _hash_tiles(self, frame: np.ndarray) -> list[list[bytes]]:
+        tile: int = self.tile_size
+        height, width = frame.shape[:2]
+        return [
+            [
+                hashlib.blake2b(
+                    np.ascontiguousarray(frame[top : top + tile, left : left + tile]),
+                    digest_size=8,
+                ).digest()
+                for left in range(0, width, tile)
+            ]
+            for top in range(0, height, tile)
+        ]
+
+    def update(self, frame: np.ndarray, source: object | None = None) -> int:
+        """
+        Hash a newly processed frame and record which tiles changed.
+
+        A frame of a different size marks every tile as changed.
+
+        Args:
+            frame (np.ndarray): The frame, as an array
+            source (object | None): The captured frame 'frame' was made from; if it
+                is the same object as the last update's, the frame is not hashed again
+
+        Returns:
+            int: The generation of this frame
+        """
+        with self._lock:
+            if source is not None and source is self._source:
+                return self.generation
+        hashes: list[list[bytes]] = self._hash_tiles(frame)
+        frame_size: tuple[int, int] = (int(frame.shape[1]), int(frame.shape[0]))
+        with self._lock:
+            self.generation += 1
+            if frame_size != self._frame_size:
+                self._frame_size = frame_size
+                self._changed_at = np.full(
+                    (len(hashes), len(hashes[0]) if hashes else 0),
+                    self.generation,
+                    dtype=np.int64,
+                )
+                self.changed_tiles = {
+                    (column, row)
+                    for row in range(self._changed_at.shape[0])
+                    for column in range(self._changed_at.shape[1])
+                }
+            else:
+                self.changed_tiles = {
+                    (column, row)
+                    for row, (new_row, old_row) in enumerate(zip(hashes, self._hashes))
+                    for column, (new, old) in enumerate(zip(new_row, old_row))
+                    if new != old
+                }
+                for column, row in self.changed_tiles:
+                    self._changed_at[row, column] = self.generation
+            self._hashes = hashes
+            self._source = source
+            return self.generation
+
+    def changed_since(
+        self,
+        generation: int,
+        region: tuple[int, int, int, int] | None = None,
+    ) -> bool:
+        """
+        Check whether a region changed in any frame after the given generation.
+
+        Args:
+            generation (int): The generation a cached result was computed at
+            region (tuple[int, int, int, int] | None): (left, top, width, height), or None for the whole frame
+
+        Returns:
+            bool: True if any tile overlapping the region changed since then
+        """
+        tile: int = self.tile_size
+        with self._lock:
+            if generation < 1 or not self._changed_at.size:
+                return True
+            if region is None:
+                tiles: np.ndarray = self._changed_at
+            else:
+                left, top, width, height = region
+                tiles = self._changed_at[
+                    max(top, 0) // tile : max(top + height + tile - 1, 0) // tile,
+                    max(left, 0) // tile : max(left + width + tile - 1, 0) // tile,
+                ]
+            return bool(tiles.size) and int(tiles.max()) > generation
+
+    def changed_regions(self) -> list[tuple[int, int, int, int]]:
+        """
+        Get the pixel bounds of the tiles changed by the last frame.
+
+        Returns:
+            list[tuple[int, int, int, int]]: (left, top, width, height) of each changed tile
+        """
+        tile: int = self.tile_size
+        with self._lock:
+            if self._frame_size is None:
+                return []
+            width, height = self._frame_size
+            return [
+                (
+                    column * tile,
+                    row * tile,
+                    min(tile, width - column * tile),
+                    min(tile, height - row * tile),
+                )
+                for column, row in sorted(self.changed_tiles)
+            ]
+
+    def reset(self) -> None:
+        """Forget the last frame, so the next one marks every tile as changed."""
+        with self._lock:
+            self._frame_size = None
+            self._hashes = []
+            self._changed_at = np.zeros((0, 0), dtype=np.int64)
+            self._source = None
+            self.changed_tiles = set()
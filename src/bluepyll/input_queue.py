@@ -0,0 +1,120 @@
+"""
+Coalescing input command queue for BluePyll
+"""
+
+import logging
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from threading import Lock, Timer
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class InputQueue:
+    """
+    Buffers input commands (taps, key events, text) and sends them as one shell call.
+
+    The queue is flushed explicitly with 'flush', when a batching block ends,
+    when the optional time window elapses, when 'max_batch' commands are pending,
+    and by the controller before any screenshot or other shell command so that
+    ordering is preserved.
+
+    Attributes:
+        flush_window_s (float | None): If set, the queue is always active and pending
+            commands are flushed this many seconds after the first one was queued
+        max_batch (int): Number of pending commands that triggers a flush
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Any],
+        flush_window_s: float | None = None,
+        max_batch: int = 64,
+    ) -> None:
+        """
+        Initialize an InputQueue.
+
+        Args:
+            send (Callable[[str], Any]): Runs a combined shell command
+            flush_window_s (float | None): Time window after which pending commands are flushed
+            max_batch (int): Number of pending commands that triggers a flush
+        """
+        if flush_window_s is not None and flush_window_s < 0:
+            raise ValueError("flush_window_s must be a non-negative number")
+        if max_batch < 1:
+            raise ValueError("max_batch must be a positive integer")
+        self.flush_window_s: float | None = flush_window_s
+        self.max_batch: int = int(max_batch)
+        self._send: Callable[[str], Any] = send
+        self._pending: list[str] = []
+        self._batch_depth: int = 0
+        self._timer: Timer | None = None
+        self._lock: Lock = Lock()
+
+    @property
+    def active(self) -> bool:
+        """Whether input commands are currently queued instead of sent immediately."""
+        return self.flush_window_s is not None or self._batch_depth > 0
+
+    @property
+    def pending(self) -> list[str]:
+        with self._lock:
+            return list(self._pending)
+
+    def enqueue(self, command: str) -> None:
+        """
+        Queue an input command.
+
+        Args:
+            command (str): The input shell command
+        """
+        with self._lock:
+            self._pending.append(command)
+            should_flush: bool = len(self._pending) >= self.max_batch
+            if (
+                not should_flush
+                and self.flush_window_s is not None
+                and self._timer is None
+            ):
+                self._timer = Timer(self.flush_window_s, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> Any:
+        """
+        Send all pending commands as a single shell invocation.
+
+        Returns:
+            Any: The result of the shell call, or None if nothing was pending
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            commands, self._pending = self._pending, []
+        if not commands:
+            return None
+        logger.debug(f"Flushing {len(commands)} queued input command(s)")
+        return self._send("; ".join(commands))
+
+    @contextmanager
+    def batch(self) -> Iterator["InputQueue"]:
+        """
+        Queue every input command issued inside the block and flush them on exit.
+
+        Yields:
+            InputQueue: This queue
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost: bool = self._batch_depth == 0
+            if outermost:
+                self.flush()
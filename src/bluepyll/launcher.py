@@ -0,0 +1,301 @@
+"""
+PID-tracked BlueStacks process management for BluePyll
+"""
+
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from threading import Lock
+
+from .constants import BluestacksConstants
+from .lazy import lazy_import
+
+psutil = lazy_import("psutil")
+
+logger = logging.getLogger(__name__)
+
+# Every launcher in the process shares one state file
+_state_lock: Lock = Lock()
+
+
+class BluestacksLauncher:
+    """
+    Starts, tracks and stops the HD-Player process of one BlueStacks instance.
+
+    The launcher keeps a handle on the process it spawned, so liveness checks
+    are a single lookup instead of a scan of every process on the host. The
+    PID and start time are written to a small state file keyed by ADB port,
+    which lets a new controller reattach to an instance started by an earlier
+    one. The full process table is only scanned as a last resort, when no
+    tracked process exists (e.g. HD-Player handed over to an instance that was
+    already running). Only a player that provably belongs to this instance is
+    adopted, so a launcher never takes over (and later kills) another
+    instance's player.
+
+    Attributes:
+        port (int): The ADB port of the instance, used as its key in the state file
+        state_file (Path): The JSON file the tracked PIDs are stored in
+        instance (str | None): The BlueStacks instance name passed to HD-Player as '--instance'
+        process (psutil.Process | None): The tracked HD-Player process
+    """
+
+    PROCESS_NAME: str = "HD-Player.exe"
+
+    def __init__(
+        self,
+        port: int,
+        state_file: str | Path | None = None,
+        instance: str | None = None,
+    ) -> None:
+        """
+        Initialize a BluestacksLauncher.
+
+        Args:
+            port (int): The ADB port of the instance
+            state_file (str | Path | None): The JSON state file (default: 'processes.json' in 'USER_STATE_DIR')
+            instance (str | None): The BlueStacks instance name (e.g. "Pie64_1"); None for the default instance
+        """
+        self.port: int = port
+        self.instance: str | None = instance
+        self.state_file: Path = Path(
+            state_file
+            if state_file is not None
+            else os.path.join(BluestacksConstants.USER_STATE_DIR, "processes.json")
+        )
+        self.process: psutil.Process | None = None
+        self._popen: subprocess.Popen | None = None
+        self._lock: Lock = Lock()
+
+    @property
+    def pid(self) -> int | None:
+        return self.process.pid if self.process is not None else None
+
+    def _read_state(self) -> dict[str, dict]:
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, entry: dict | None) -> None:
+        with _state_lock:
+            state: dict[str, dict] = self._read_state()
+            if entry is None:
+                state.pop(str(self.port), None)
+            else:
+                state[str(self.port)] = entry
+            try:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                # Unique per write, so concurrent writers never share a temp file
+                with tempfile.NamedTemporaryFile(
+                    "w",
+                    encoding="utf-8",
+                    dir=self.state_file.parent,
+                    prefix=f"{self.state_file.stem}.",
+                    suffix=".tmp",
+                    delete=False,
+                ) as f:
+                    json.dump(state, f)
+                try:
+                    os.replace(f.name, self.state_file)
+                except OSError:
+                    os.unlink(f.name)
+                    raise
+            except OSError as e:
+                logger.debug(f"Could not write launcher state file: {e}")
+
+    def _track(self, process: "psutil.Process") -> None:
+        self.process = process
+        try:
+            self._write_state(
+                {"pid": process.pid, "create_time": process.create_time()}
+            )
+        except psutil.Error as e:
+            logger.debug(f"Could not record tracked process: {e}")
+        logger.debug(f"Tracking {self.PROCESS_NAME} with pid {process.pid}")
+
+    def _is_player(self, process: "psutil.Process") -> bool:
+        try:
+            return process.name().lower() == self.PROCESS_NAME.lower()
+        except psutil.Error:
+            return False
+
+    def attach(self) -> bool:
+        """
+        Reattach to the process recorded in the state file, if it is still running.
+
+        The recorded start time is compared as well, so a reused PID is never adopted.
+
+        Returns:
+            bool: True if a live process was reattached
+        """
+        with self._lock:
+            entry: dict | None = self._read_state().get(str(self.port))
+            if not entry:
+                return False
+            try:
+                process: psutil.Process = psutil.Process(int(entry["pid"]))
+                if process.create_time() == entry.get(
+                    "create_time"
+                ) and self._is_player(process):
+                    self.process = process
+                    logger.debug(
+                        f"Reattached to {self.PROCESS_NAME} (pid {process.pid})"
+                    )
+                    return True
+            except (psutil.Error, KeyError, TypeError, ValueError):
+                pass
+            self._write_state(None)
+            return False
+
+    @staticmethod
+    def _instance_of(process: "psutil.Process") -> str | None:
+        """Get the '--instance' argument of an HD-Player process, if it has one."""
+        try:
+            args: list[str] = process.cmdline()
+        except psutil.Error:
+            return None
+        for i, arg in enumerate(args):
+            if arg.startswith("--instance="):
+                return arg.split("=", 1)[1]
+            if arg == "--instance" and i + 1 < len(args):
+                return args[i + 1]
+        return None
+
+    def adopt(self) -> bool:
+        """
+        Scan the process table once for this instance's running HD-Player and track it.
+
+        A player is this instance's if its '--instance' argument matches
+        'instance'. Players tracked for other ports in the state file are never
+        considered, and without an 'instance' a player is only adopted if it
+        is the only candidate left.
+
+        Returns:
+            bool: True if this instance's HD-Player was found
+        """
+        with self._lock:
+            tracked_elsewhere: set[int] = set()
+            for port, entry in self._read_state().items():
+                if port != str(self.port) and isinstance(entry, dict):
+                    try:
+                        tracked_elsewhere.add(int(entry["pid"]))
+                    except (KeyError, TypeError, ValueError):
+                        pass
+            candidates: list[psutil.Process] = [
+                process
+                for process in psutil.process_iter(["name"])
+                if (process.info["name"] or "").lower() == self.PROCESS_NAME.lower()
+                and process.pid not in tracked_elsewhere
+            ]
+            if self.instance is not None:
+                candidates = [
+                    process
+                    for process in candidates
+                    if self._instance_of(process) == self.instance
+                ]
+            if len(candidates) != 1:
+                if candidates:
+                    logger.warning(
+                        f"{len(candidates)} {self.PROCESS_NAME} processes could belong to "
+                        f"port {self.port}; set 'instance' to tell them apart"
+                    )
+                return False
+            self._track(candidates[0])
+            return True
+
+    def launch(self, filepath: str) -> int:
+        """
+        Start HD-Player and track the spawned process.
+
+        Args:
+            filepath (str): The path to HD-Player.exe
+
+        Returns:
+            int: The PID of the spawned process
+
+        Raises:
+            OSError: If the process cannot be started
+        """
+        with self._lock:
+            # Detach the player so it outlives the Python process (Windows-only flags)
+            creationflags: int = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(
+                subprocess, "CREATE_NEW_PROCESS_GROUP", 0
+            )
+            self._popen = subprocess.Popen(
+                [filepath, *(["--instance", self.instance] if self.instance else [])],
+                cwd=os.path.dirname(filepath) or None,
+                creationflags=creationflags,
+            )
+            self._track(psutil.Process(self._popen.pid))
+            return self._popen.pid
+
+    def is_alive(self) -> bool:
+        """
+        Check whether the tracked process is running, without scanning the process table.
+
+        If the process this launcher spawned has exited (HD-Player exits at once
+        when it hands over to an instance that is already running), the running
+        instance is adopted with a single scan.
+
+        Returns:
+            bool: True if a tracked HD-Player process is running
+        """
+        process: psutil.Process | None = self.process
+        if process is not None:
+            try:
+                if process.is_running() and process.status() != psutil.STATUS_ZOMBIE:
+                    return True
+            except psutil.Error:
+                pass
+            self.process = None
+        if self._popen is not None and self._popen.poll() is not None:
+            self._popen = None
+            return self.adopt()
+        return False
+
+    def children(self) -> list["psutil.Process"]:
+        """
+        Get the child processes of the tracked process.
+
+        Returns:
+            list[psutil.Process]: The child processes, recursively
+        """
+        if self.process is None:
+            return []
+        try:
+            return self.process.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def kill(self, timeout_s: float = BluestacksConstants.PROCESS_WAIT_TIMEOUT) -> bool:
+        """
+        Kill the tracked process and its children, and forget it.
+
+        Args:
+            timeout_s (float): Time to wait for the processes to exit
+
+        Returns:
+            bool: True if no tracked process is left running
+        """
+        with self._lock:
+            if self.process is None:
+                return True
+            processes: list[psutil.Process] = [*self.children(), self.process]
+            for process in processes:
+                try:
+                    process.kill()
+                except psutil.NoSuchProcess:
+                    pass
+            _, alive = psutil.wait_procs(processes, timeout=timeout_s)
+            if alive:
+                logger.warning(f"Processes still running after kill: {alive}")
+                return False
+            self.process = None
+            self._popen = None
+            self._write_state(None)
+            return True
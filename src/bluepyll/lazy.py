@@ -0,0 +1,64 @@
+"""
+Deferred imports of heavy dependencies for BluePyll
+"""
+
+import importlib
+import logging
+import sys
+from threading import Lock
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule(ModuleType):
+    """
+    A stand-in for a module that is only imported on first attribute access.
+
+    Heavy or platform-specific dependencies (EasyOCR and torch, OpenCV,
+    PyAutoGUI, pywin32, psutil) are bound through this class, so importing
+    BluePyll does not pay for libraries a program never uses.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize a LazyModule.
+
+        Args:
+            name (str): The fully qualified name of the module to import
+        """
+        super().__init__(name)
+        self._module: ModuleType | None = None
+        self._lock: Lock = Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    logger.debug(f"Importing {self.__name__}...")
+                    self._module = importlib.import_module(self.__name__)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state: str = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Get a module that is imported the first time one of its attributes is used.
+
+    Args:
+        name (str): The fully qualified name of the module
+
+    Returns:
+        ModuleType: The module if it is already imported, otherwise a LazyModule
+    """
+    module: ModuleType | None = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
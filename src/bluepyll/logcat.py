@@ -0,0 +1,287 @@
+"""
+Event-driven app state tracking for BluePyll
+"""
+
+import logging
+import re
+import time
+from collections.abc import Callable, Iterable
+from enum import Enum
+from threading import Condition, Event, Lock, Thread
+
+from .adb_pool import StreamConnection
+from .app import BluePyllApp
+from .constants import BluestacksConstants
+from .state_machine import AppLifecycleState
+
+logger = logging.getLogger(__name__)
+
+# A line of 'logcat -v brief' output: "I/am_proc_start( 512): [0,1234,...]"
+LOGCAT_LINE_PATTERN: re.Pattern = re.compile(
+    r"^[VDIWEF]/(?P<tag>[^(]+?)\s*\(\s*\d+\): (?P<message>.*)$"
+)
+DISPLAYED_PATTERN: re.Pattern = re.compile(r"Displayed (?P<package>[\w.]+)/")
+
+
+def _event_fields(message: str) -> list[str]:
+    return [field.strip() for field in message.strip().strip("[]").split(",")]
+
+
+def _component_package(component: str) -> str:
+    return component.strip("{}").split("/")[0]
+
+
+class LogcatWatcher:
+    """
+    Drives app lifecycle states from a single long-lived 'logcat' stream.
+
+    A background thread follows the 'events' and 'main' log buffers and maps
+    activity manager events to 'AppLifecycleState' transitions on the watched apps:
+
+    - 'am_proc_start': CLOSED -> LOADING
+    - 'am_focused_activity' / 'wm_on_resume_called': CLOSED -> LOADING
+    - 'ActivityTaskManager: Displayed': -> READY
+    - 'am_proc_died' / 'am_kill': -> CLOSED
+
+    Attributes:
+        controller: The BluePyllController to read the log from
+        apps (dict[str, BluePyllApp]): The watched apps, keyed by package name
+    """
+
+    COMMAND: str = "logcat -b events -b main -v brief -T 1"
+
+    def __init__(self, controller, apps: Iterable[BluePyllApp] = ()) -> None:
+        """
+        Initialize a LogcatWatcher.
+
+        Args:
+            controller: The BluePyllController to read the log from
+            apps (Iterable[BluePyllApp]): Apps to watch from the start
+        """
+        self.controller = controller
+        self.apps: dict[str, BluePyllApp] = {app.package_name: app for app in apps}
+        self._listeners: list[Callable[[BluePyllApp, Enum], None]] = []
+        self._condition: Condition = Condition()
+        self._stop_event: Event = Event()
+        self._thread: Thread | None = None
+        self._connection: StreamConnection | None = None
+        self._connection_lock: Lock = Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self) -> "LogcatWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def watch(self, app: BluePyllApp) -> None:
+        """
+        Start tracking an app's lifecycle state.
+
+        Args:
+            app (BluePyllApp): The app to watch
+        """
+        with self._condition:
+            self.apps[app.package_name] = app
+
+    def unwatch(self, app: BluePyllApp) -> None:
+        """
+        Stop tracking an app's lifecycle state.
+
+        Args:
+            app (BluePyllApp): The app to stop watching
+        """
+        with self._condition:
+            self.apps.pop(app.package_name, None)
+
+    def add_listener(self, listener: Callable[[BluePyllApp, Enum], None]) -> None:
+        """
+        Register a callback run after every state transition the watcher makes.
+
+        Args:
+            listener (Callable[[BluePyllApp, Enum], None]): Called as 'listener(app, new_state)'
+        """
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """Start following the log in a background thread."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="bluepyll-logcat", daemon=True)
+        self._thread.start()
+        logger.debug("Logcat watcher started")
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        """
+        Stop following the log and wait for the background thread to exit.
+
+        The watcher's connection is shut down, which ends the read the thread is
+        blocked in while the log is quiet.
+
+        Args:
+            timeout_s (float): Time to wait for the background thread
+        """
+        self._stop_event.set()
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.interrupt()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_s)
+            if self._thread.is_alive():
+                logger.warning(
+                    f"Logcat watcher did not stop within {timeout_s} seconds"
+                )
+                return
+            self._thread = None
+        logger.debug("Logcat watcher stopped")
+
+    def wait_for_state(
+        self,
+        app: BluePyllApp,
+        states: Iterable[Enum],
+        timeout_s: float | None = None,
+    ) -> bool:
+        """
+        Block until an app reaches one of the given states.
+
+        Args:
+            app (BluePyllApp): The app to wait for
+            states (Iterable[Enum]): The states to wait for
+            timeout_s (float | None): Maximum time to wait
+
+        Returns:
+            bool: True if the app reached one of the states, False on timeout or stop
+        """
+        states = tuple(states)
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: app.app_state.current_state in states
+                or self._stop_event.is_set(),
+                timeout=timeout_s,
+            ) and (app.app_state.current_state in states)
+
+    def handle_line(self, line: str) -> None:
+        """
+        Apply a single line of 'logcat -v brief' output.
+
+        Args:
+            line (str): The log line
+        """
+        match = LOGCAT_LINE_PATTERN.match(line.strip())
+        if match is None:
+            return
+        tag: str = match.group("tag")
+        message: str = match.group("message")
+        match tag:
+            case "am_proc_start":
+                fields: list[str] = _event_fields(message)
+                if len(fields) > 3:
+                    self._apply(fields[3].split(":")[0], AppLifecycleState.LOADING)
+            case "am_proc_died" | "am_kill":
+                fields: list[str] = _event_fields(message)
+                # Only the death of the app's main process closes the app
+                if len(fields) > 2 and ":" not in fields[2]:
+                    self._apply(fields[2], AppLifecycleState.CLOSED)
+            case "am_focused_activity" | "wm_on_resume_called":
+                fields: list[str] = _event_fields(message)
+                if len(fields) > 1:
+                    # 'wm_on_resume_called' reports the activity class name, which
+                    # usually lives under the package name
+                    self._apply(
+                        _component_package(fields[1]),
+                        AppLifecycleState.LOADING,
+                        match_prefix=True,
+                    )
+            case "ActivityTaskManager" | "ActivityManager":
+                displayed = DISPLAYED_PATTERN.search(message)
+                if displayed is not None:
+                    self._apply(displayed.group("package"), AppLifecycleState.READY)
+
+    def _find_app(self, name: str, match_prefix: bool = False) -> BluePyllApp | None:
+        app: BluePyllApp | None = self.apps.get(name)
+        if app is not None or not match_prefix:
+            return app
+        for package_name, app in self.apps.items():
+            if name.startswith(f"{package_name}."):
+                return app
+        return None
+
+    def _apply(self, name: str, new_state: Enum, match_prefix: bool = False) -> None:
+        with self._condition:
+            app: BluePyllApp | None = self._find_app(name, match_prefix)
+            if app is None or app.app_state.current_state == new_state:
+                return
+            match new_state:
+                case AppLifecycleState.LOADING:
+                    # Focus and process start only ever open a closed app
+                    if app.app_state.current_state != AppLifecycleState.CLOSED:
+                        return
+                case AppLifecycleState.READY:
+                    if app.app_state.current_state == AppLifecycleState.CLOSED:
+                        app.app_state.transition_to(AppLifecycleState.LOADING)
+            app.app_state.transition_to(new_state)
+            logger.debug(f"{app.app_name.title()} app -> {new_state} (logcat)")
+            self._sync_running_apps(app, new_state)
+            self._condition.notify_all()
+        for listener in self._listeners:
+            try:
+                listener(app, new_state)
+            except Exception as e:
+                logger.warning(f"Error in logcat watcher listener: {e}")
+
+    def _sync_running_apps(self, app: BluePyllApp, new_state: Enum) -> None:
+        running_apps: list[BluePyllApp] | None = getattr(
+            self.controller, "running_apps", None
+        )
+        if running_apps is None:
+            return
+        running_apps[:] = [
+            existing_app
+            for existing_app in running_apps
+            if existing_app.package_name != app.package_name
+        ]
+        if new_state != AppLifecycleState.CLOSED:
+            running_apps.append(app)
+
+    def _run(self) -> None:
+        # 'logcat' can drop the stream (e.g. when BlueStacks restarts), so keep following it
+        while not self._stop_event.is_set():
+            # A dedicated connection, so the watcher never holds a bulk transfer slot
+            connection: StreamConnection = StreamConnection(
+                self.controller.ip, self.controller.port
+            )
+            with self._connection_lock:
+                if self._stop_event.is_set():
+                    break
+                self._connection = connection
+            try:
+                connection.connect()
+                self._follow(connection.device)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning(f"Logcat stream interrupted, restarting: {e}")
+                time.sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
+            finally:
+                with self._connection_lock:
+                    self._connection = None
+                connection.close()
+
+    def _follow(self, device) -> None:
+        buffer: bytes = b""
+        for chunk in device.streaming_shell(
+            self.COMMAND, read_timeout_s=3600.0, decode=False
+        ):
+            if self._stop_event.is_set():
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                self.handle_line(line.decode("utf-8", errors="replace"))
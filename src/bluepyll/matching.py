@@ -0,0 +1,265 @@
+"""
+OpenCV template matching for BluePyll
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from .lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Match:
+    """
+    Where a needle was found in a frame.
+
+    Attributes:
+        left (int): Left edge of the match, in frame pixels
+        top (int): Top edge of the match, in frame pixels
+        width (int): Width of the match
+        height (int): Height of the match
+        score (float): Normalized correlation score, from -1.0 to 1.0
+    """
+
+    left: int
+    top: int
+    width: int
+    height: int
+    score: float
+
+    @property
+    def center(self) -> tuple[int, int]:
+        """The coords of the center of the match."""
+        return (self.left + self.width // 2, self.top + self.height // 2)
+
+
+def to_grayscale(image: np.ndarray | bytes | str | Path | Image.Image) -> np.ndarray:
+    """
+    Load any supported frame or needle as a 2-D uint8 grayscale array.
+
+    Arrays that are already grayscale are returned as they are, so callers can
+    convert a frame once and match many needles against it.
+
+    Args:
+        image (np.ndarray | bytes | str | Path | Image.Image): An RGBA/RGB/grayscale
+            array, encoded image bytes, an image path or a PIL Image
+
+    Returns:
+        np.ndarray: The grayscale image
+
+    Raises:
+        ValueError: If the image cannot be read
+    """
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert("L"))
+    if isinstance(image, np.ndarray):
+        match image.ndim, image.shape[-1]:
+            case 2, _:
+                return image
+            case 3, 4:
+                return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+            case _:
+                return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    source: str = "image bytes"
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        data: bytes | bytearray | memoryview = image
+    else:
+        source = str(image)
+        # Package assets are Traversables, which may not live on the filesystem
+        read_bytes = getattr(image, "read_bytes", None)
+        data = read_bytes() if read_bytes is not None else Path(image).read_bytes()
+    gray: np.ndarray | None = cv2.imdecode(
+        np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE
+    )
+    if gray is None:
+        raise ValueError(f"Could not decode {source}")
+    return gray
+
+
+def match_template(
+    haystack: np.ndarray,
+    needle: np.ndarray,
+    confidence: float,
+    region: tuple[int, int, int, int] | None = None,
+) -> Match | None:
+    """
+    Find the best match of a needle in a frame with 'cv2.matchTemplate'.
+
+    Both images must already be grayscale (see 'to_grayscale'). Scoring uses
+    TM_CCOEFF_NORMED, so 'confidence' has the same meaning as in PyAutoGUI.
+
+    Args:
+        haystack (np.ndarray): The grayscale frame
+        needle (np.ndarray): The grayscale needle, at the frame's resolution
+        confidence (float): Minimum score for a match
+        region (tuple[int, int, int, int] | None): (left, top, width, height) to search in
+
+    Returns:
+        Match | None: The best match, or None if nothing scored at least 'confidence'
+    """
+    offset_x: int = 0
+    offset_y: int = 0
+    if region is not None:
+        left, top, width, height = region
+        offset_x, offset_y = max(left, 0), max(top, 0)
+        haystack = haystack[
+            offset_y : max(top + height, 0), offset_x : max(left + width, 0)
+        ]
+    needle_height, needle_width = needle.shape[:2]
+    if (
+        not needle.size
+        or haystack.shape[0] < needle_height
+        or haystack.shape[1] < needle_width
+    ):
+        return None
+    scores: np.ndarray = cv2.matchTemplate(haystack, needle, cv2.TM_CCOEFF_NORMED)
+    _, score, _, (x, y) = cv2.minMaxLoc(scores)
+    # A flat needle has no variance to correlate and scores NaN/inf
+    if not np.isfinite(score) or score < confidence:
+        return None
+    return Match(
+        left=offset_x + int(x),
+        top=offset_y + int(y),
+        width=int(needle_width),
+        height=int(needle_height),
+        score=float(score),
+    )
+
+
+def scale_needle(
+    needle: np.ndarray,
+    screen_size: tuple[int, int],
+    og_window_size: tuple[int, int],
+    scale: float = 1.0,
+) -> np.ndarray:
+    """
+    Scale a needle from the window size it was captured at to a frame size.
+
+    Args:
+        needle (np.ndarray): The grayscale needle
+        screen_size (tuple[int, int]): The (width, height) of the frames to search
+        og_window_size (tuple[int, int]): The (width, height) the needle was captured at
+        scale (float): Extra factor applied on top of the window-to-frame ratio
+
+    Returns:
+        np.ndarray: The scaled needle
+    """
+    needle_height, needle_width = needle.shape[:2]
+    scaled_size: tuple[int, int] = (
+        max(int(needle_width * scale * screen_size[0] / og_window_size[0]), 1),
+        max(int(needle_height * scale * screen_size[1] / og_window_size[1]), 1),
+    )
+    if scaled_size == (needle_width, needle_height):
+        return needle
+    return cv2.resize(
+        needle,
+        scaled_size,
+        interpolation=(
+            cv2.INTER_AREA if scaled_size[0] < needle_width else cv2.INTER_LINEAR
+        ),
+    )
+
+
+class NeedleCache:
+    """
+    A process-wide cache of decoded, grayscaled and scaled element images.
+
+    Entries are keyed by (asset path, asset mtime, frame size, original window
+    size, extra scale), so every element and controller in the process shares one copy of
+    each needle and an edited asset is picked up on its next lookup. Each
+    asset is decoded once; other frame sizes are scaled from that copy.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups that had to decode or scale a needle
+    """
+
+    def __init__(self) -> None:
+        """Initialize a NeedleCache."""
+        self.hits: int = 0
+        self.misses: int = 0
+        self._decoded: dict[tuple[str, float | None], np.ndarray] = {}
+        self._scaled: dict[tuple, np.ndarray] = {}
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._scaled)
+
+    @staticmethod
+    def _mtime(path: Any) -> float | None:
+        # A metadata lookup only; assets inside archives have no mtime
+        try:
+            return os.stat(path).st_mtime
+        except (OSError, TypeError):
+            return None
+
+    def get(
+        self,
+        path: Any,
+        screen_size: tuple[int, int],
+        og_window_size: tuple[int, int],
+        scale: float = 1.0,
+    ) -> np.ndarray:
+        """
+        Get an element image as a grayscale needle scaled to a frame size.
+
+        Args:
+            path (Any): Path (or package resource) of the element image
+            screen_size (tuple[int, int]): The (width, height) of the frames to search
+            og_window_size (tuple[int, int]): The (width, height) the image was captured at
+            scale (float): Extra factor applied on top of the window-to-frame ratio
+
+        Returns:
+            np.ndarray: The grayscale needle
+
+        Raises:
+            ValueError: If the image cannot be read
+        """
+        asset_key: tuple[str, float | None] = (str(path), self._mtime(path))
+        key: tuple = (
+            *asset_key,
+            tuple(screen_size),
+            tuple(og_window_size),
+            float(scale),
+        )
+        needle: np.ndarray | None = self._scaled.get(key)
+        if needle is not None:
+            self.hits += 1
+            return needle
+        with self._lock:
+            needle = self._scaled.get(key)
+            if needle is not None:
+                self.hits += 1
+                return needle
+            self.misses += 1
+            decoded: np.ndarray | None = self._decoded.get(asset_key)
+            if decoded is None:
+                logger.debug(f"Decoding needle {asset_key[0]}")
+                decoded = to_grayscale(path)
+                decoded.flags.writeable = False
+                self._decoded[asset_key] = decoded
+            needle = scale_needle(decoded, screen_size, og_window_size, scale)
+            needle.flags.writeable = False
+            self._scaled[key] = needle
+            return needle
+
+    def clear(self) -> None:
+        """Drop every cached needle."""
+        with self._lock:
+            self._decoded.clear()
+            self._scaled.clear()
+
+
+# Shared by every element and controller in the process
+needle_cache: NeedleCache = NeedleCache()
@@ -0,0 +1,351 @@
+"""
+Shared OCR inference server for BluePyll
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from collections.abc import Sequence
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock, Thread
+from typing import Any
+
+import numpy as np
+
+from .constants import BluestacksConstants
+from .exceptions import BluePyllError, TimeoutError
+from .utils import ImageTextChecker
+
+logger = logging.getLogger(__name__)
+
+
+def _handle_connection(conn: Connection, requests: queue.Queue) -> None:
+    """Read OCR requests from one client and queue them for the batch loop."""
+    send_lock: Lock = Lock()
+    segment: SharedMemory | None = None
+    try:
+        while True:
+            segment_name, shapes, kwargs = conn.recv()
+            if segment is None or segment.name != segment_name:
+                if segment is not None:
+                    segment.close()
+                # The client owns the segment and unlinks it, so it is not tracked here
+                segment = SharedMemory(name=segment_name, track=False)
+            # The client packs its images back to back in the segment
+            images: list[np.ndarray] = []
+            offset: int = 0
+            for shape in shapes:
+                image: np.ndarray = np.ndarray(
+                    shape, dtype=np.uint8, buffer=segment.buf, offset=offset
+                )
+                images.append(image.copy())
+                offset += image.nbytes
+                del image
+            requests.put((conn, send_lock, images, kwargs))
+    except (EOFError, OSError):
+        pass
+    finally:
+        if segment is not None:
+            segment.close()
+        conn.close()
+
+
+def _accept_connections(listener: Listener, requests: queue.Queue) -> None:
+    while True:
+        conn: Connection = listener.accept()
+        Thread(target=_handle_connection, args=(conn, requests), daemon=True).start()
+
+
+def _reply(conn: Connection, send_lock: Lock, message: tuple) -> None:
+    try:
+        with send_lock:
+            conn.send(message)
+    except (EOFError, OSError) as e:
+        logger.debug(f"OCR client went away before its reply: {e}")
+
+
+def _run_batches(
+    checker: ImageTextChecker,
+    requests: queue.Queue,
+    max_batch: int,
+    batch_window_s: float,
+) -> None:
+    while True:
+        batch: list[tuple] = [requests.get()]
+        # Give other controllers a moment to add their frames to this batch
+        deadline: float = time.monotonic() + batch_window_s
+        while len(batch) < max_batch:
+            remaining_s: float = deadline - time.monotonic()
+            try:
+                batch.append(
+                    requests.get(timeout=remaining_s)
+                    if remaining_s > 0
+                    else requests.get_nowait()
+                )
+            except queue.Empty:
+                break
+        # Requests with the same OCR arguments run as one batched inference
+        groups: dict[str, list[tuple]] = {}
+        for request in batch:
+            groups.setdefault(repr(sorted(request[3].items())), []).append(request)
+        for requests_in_group in groups.values():
+            images: list[np.ndarray] = [
+                image
+                for _, _, request_images, _ in requests_in_group
+                for image in request_images
+            ]
+            try:
+                results: list[list[str]] = checker._read_grayscale_batch(
+                    images, **requests_in_group[0][3]
+                )
+            except Exception as e:
+                for conn, send_lock, _, _ in requests_in_group:
+                    _reply(conn, send_lock, ("error", str(e)))
+                continue
+            offset: int = 0
+            for conn, send_lock, request_images, _ in requests_in_group:
+                _reply(
+                    conn,
+                    send_lock,
+                    ("ok", results[offset : offset + len(request_images)]),
+                )
+                offset += len(request_images)
+
+
+def _serve(
+    address: tuple[str, int] | str,
+    authkey: bytes,
+    ready_conn: Connection,
+    max_batch: int,
+    batch_window_s: float,
+) -> None:
+    """Entry point of the OCR server process."""
+    checker: ImageTextChecker = ImageTextChecker(warm_up=True)
+    listener: Listener = Listener(address, authkey=authkey)
+    ready_conn.send(listener.address)
+    ready_conn.close()
+    requests: queue.Queue = queue.Queue()
+    Thread(target=_accept_connections, args=(listener, requests), daemon=True).start()
+    _run_batches(checker, requests, max_batch, batch_window_s)
+
+
+class OcrClient(ImageTextChecker):
+    """
+    An ImageTextChecker that sends its frames to a shared OcrServer.
+
+    Frames are converted to grayscale locally and passed to the server through
+    a shared memory block that is reused between calls, so only a small
+    request message goes over the socket. 'check_text' and 'read_text' behave
+    exactly like the local ImageTextChecker.
+
+    Attributes:
+        address (tuple[str, int] | str): The address of the OcrServer
+    """
+
+    def __init__(self, address: tuple[str, int] | str, authkey: bytes) -> None:
+        """
+        Initialize an OcrClient.
+
+        The connection is opened on first use.
+
+        Args:
+            address (tuple[str, int] | str): The address of the OcrServer
+            authkey (bytes): The OcrServer's authentication key
+        """
+        super().__init__()
+        self.address: tuple[str, int] | str = address
+        self._authkey: bytes = authkey
+        self._conn: Connection | None = None
+        self._segment: SharedMemory | None = None
+        self._lock: Lock = Lock()
+
+    def __enter__(self) -> "OcrClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def reader(self):
+        raise BluePyllError("OcrClient runs OCR on its server and has no local reader")
+
+    def warm_up(self) -> Thread:
+        """Open the connection to the server in a background thread."""
+        thread: Thread = Thread(
+            target=self._connect, name="bluepyll-ocr-warm-up", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _connect(self) -> Connection:
+        if self._conn is None:
+            self._conn = Client(self.address, authkey=self._authkey)
+        return self._conn
+
+    def _infer_batch(self, images: Sequence[np.ndarray], **kwargs) -> list[list[str]]:
+        if not images:
+            return []
+        images = [np.ascontiguousarray(image, dtype=np.uint8) for image in images]
+        size: int = sum(image.nbytes for image in images)
+        with self._lock:
+            if self._segment is None or self._segment.size < size:
+                self._release_segment()
+                self._segment = SharedMemory(create=True, size=max(size, 1))
+            offset: int = 0
+            for image in images:
+                shared_image: np.ndarray = np.ndarray(
+                    image.shape, dtype=np.uint8, buffer=self._segment.buf, offset=offset
+                )
+                shared_image[...] = image
+                offset += image.nbytes
+                del shared_image
+            try:
+                conn: Connection = self._connect()
+                conn.send(
+                    (self._segment.name, [image.shape for image in images], kwargs)
+                )
+                status, payload = conn.recv()
+            except (EOFError, OSError) as e:
+                self._close_connection()
+                raise BluePyllError(f"Lost connection to the OCR server: {e}")
+        if status != "ok":
+            raise BluePyllError(f"OCR server error: {payload}")
+        return payload
+
+    def _release_segment(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self) -> None:
+        """Close the connection and free the shared memory block."""
+        with self._lock:
+            self._close_connection()
+            self._release_segment()
+
+
+class OcrServer:
+    """
+    A separate process holding one set of EasyOCR models for many controllers.
+
+    Clients (see 'client') connect over a local socket and pass frames through
+    shared memory. Requests arriving within 'batch_window_s' of each other are
+    served together as one batched inference, so one process keeps the models busy for all controllers
+    on the host instead of every controller loading its own copy.
+
+    Attributes:
+        address (tuple[str, int] | str | None): The address clients connect to, once started
+        authkey (bytes): The key clients authenticate with
+        max_batch (int): Maximum number of requests served together
+        batch_window_s (float): Time to wait for more requests to join a batch
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int] | str = ("127.0.0.1", 0),
+        max_batch: int = 16,
+        batch_window_s: float = 0.01,
+    ) -> None:
+        """
+        Initialize an OcrServer.
+
+        Args:
+            address (tuple[str, int] | str): Address to listen on (port 0 picks a free port)
+            max_batch (int): Maximum number of requests served together
+            batch_window_s (float): Time to wait for more requests to join a batch
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be a positive integer")
+        self._listen_address: tuple[str, int] | str = address
+        self.address: tuple[str, int] | str | None = None
+        self.authkey: bytes = os.urandom(32)
+        self.max_batch: int = int(max_batch)
+        self.batch_window_s: float = batch_window_s
+        self._process: multiprocessing.Process | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def __enter__(self) -> "OcrServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def start(self, timeout_s: float = BluestacksConstants.DEFAULT_TIMEOUT) -> None:
+        """
+        Start the server process and wait until it accepts connections.
+
+        The models keep loading in the background; early requests wait for them.
+
+        Args:
+            timeout_s (float): Time to wait for the server to start listening
+
+        Raises:
+            TimeoutError: If the server does not start listening in time
+        """
+        if self.is_running:
+            return
+        context: Any = multiprocessing.get_context("spawn")
+        ready_conn, child_conn = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_serve,
+            args=(
+                self._listen_address,
+                self.authkey,
+                child_conn,
+                self.max_batch,
+                self.batch_window_s,
+            ),
+            name="bluepyll-ocr-server",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        if not ready_conn.poll(timeout_s):
+            self.stop()
+            raise TimeoutError(f"OCR server did not start within {timeout_s} seconds")
+        self.address = ready_conn.recv()
+        ready_conn.close()
+        logger.info(f"OCR server listening on {self.address}")
+
+    def client(self) -> OcrClient:
+        """
+        Create a client for this server.
+
+        Each controller should use its own client, so their requests can be batched.
+
+        Returns:
+            OcrClient: A new client
+
+        Raises:
+            BluePyllError: If the server is not running
+        """
+        if self.address is None:
+            raise BluePyllError("The OCR server has not been started")
+        return OcrClient(self.address, self.authkey)
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        """
+        Stop the server process.
+
+        Args:
+            timeout_s (float): Time to wait for the process to exit
+        """
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join(timeout=timeout_s)
+            self._process = None
+        self.address = None
+        logger.debug("OCR server stopped")
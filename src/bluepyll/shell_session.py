@@ -0,0 +1,201 @@
+"""
+Persistent ADB shell session for BluePyll
+"""
+
+import logging
+import time
+import uuid
+from threading import Lock
+
+from adb_shell import constants as adb_constants
+from adb_shell.adb_device import AdbDevice
+from adb_shell.adb_message import AdbMessage
+from adb_shell.exceptions import AdbTimeoutError
+
+from .constants import BluestacksConstants
+from .exceptions import ConnectionError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class ShellSession:
+    """
+    A long-lived interactive ``sh`` stream on an ADB device.
+
+    Instead of opening a new ADB stream (and a new ``sh`` process on the device)
+    for every command, commands are written to a single interactive shell and
+    their output is framed by unique begin/end sentinels.
+
+    Only text commands are supported: the interactive shell runs on a pty, so
+    binary output (e.g. ``screencap -p``) would be mangled and must go through
+    the regular one-shot ``AdbDevice.shell``.
+
+    Attributes:
+        device (AdbDevice): The connected ADB device the session runs on
+        timeout_s (float): Default time to wait for a command to finish
+    """
+
+    _SENTINEL_PREFIX: str = "__BLUEPYLL_"
+
+    def __init__(
+        self,
+        device: AdbDevice,
+        timeout_s: float = BluestacksConstants.DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Initialize a ShellSession.
+
+        Args:
+            device (AdbDevice): The ADB device to open the session on
+            timeout_s (float): Default time to wait for a command to finish
+        """
+        self.device: AdbDevice = device
+        self.timeout_s: float = float(timeout_s)
+        self._adb_info = None
+        self._buffer: bytes = b""
+        self._lock: Lock = Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._adb_info is not None
+
+    def open(self) -> None:
+        """
+        Open the interactive shell stream if it is not already open.
+
+        Raises:
+            ConnectionError: If the shell stream could not be opened
+        """
+        if self.is_open:
+            return
+        try:
+            self._adb_info = self.device._open(
+                b"shell:",
+                transport_timeout_s=None,
+                read_timeout_s=self.timeout_s,
+                timeout_s=None,
+            )
+        except Exception as e:
+            self._adb_info = None
+            logger.error(f"Error opening persistent shell session: {e}")
+            raise ConnectionError(f"Error opening persistent shell session: {e}")
+        self._buffer = b""
+        try:
+            # Silence the pty echo and prompt; anything printed before the first
+            # begin sentinel is discarded by the framing anyway
+            self._write(b"stty -echo 2>/dev/null; PS1=''\n", self.timeout_s)
+        except Exception as e:
+            self.close()
+            logger.error(f"Error initializing persistent shell session: {e}")
+            raise ConnectionError(f"Error initializing persistent shell session: {e}")
+        logger.debug("Persistent shell session opened")
+
+    def close(self) -> None:
+        """Close the interactive shell stream, ignoring errors on a dead stream."""
+        if not self.is_open:
+            return
+        adb_info, self._adb_info = self._adb_info, None
+        self._buffer = b""
+        try:
+            self.device._io_manager.send(
+                AdbMessage(adb_constants.CLSE, adb_info.local_id, adb_info.remote_id),
+                adb_info,
+            )
+        except Exception as e:
+            logger.debug(f"Error closing persistent shell session: {e}")
+        logger.debug("Persistent shell session closed")
+
+    def run(self, command: str, timeout_s: float | None = None) -> str:
+        """
+        Run a command in the persistent shell and return its output.
+
+        Args:
+            command (str): The shell command to run
+            timeout_s (float | None): Time to wait for the command to finish
+
+        Returns:
+            str: The command output (stdout and stderr, as seen on the pty)
+
+        Raises:
+            ConnectionError: If the shell stream fails or is closed by the device
+            TimeoutError: If the command does not finish in time
+        """
+        timeout_s = self.timeout_s if timeout_s is None else float(timeout_s)
+        with self._lock:
+            self.open()
+            tag: str = uuid.uuid4().hex[:12]
+            begin: bytes = f"{self._SENTINEL_PREFIX}BEGIN_{tag}__".encode()
+            end: bytes = f"{self._SENTINEL_PREFIX}END_{tag}__:".encode()
+            # The sentinels are split by empty quotes so the pty echo of the
+            # command line never contains them verbatim
+            framed_command: str = (
+                f'echo "{self._SENTINEL_PREFIX}""BEGIN_{tag}__"; '
+                f"{command}; "
+                f'echo "{self._SENTINEL_PREFIX}""END_{tag}__:$?"\n'
+            )
+            try:
+                self._write(framed_command.encode(), timeout_s)
+                output: bytes = self._read_framed(begin, end, timeout_s)
+            except TimeoutError:
+                self.close()
+                raise
+            except AdbTimeoutError as e:
+                self.close()
+                raise TimeoutError(f"Command did not complete in time: {e}")
+            except Exception as e:
+                self.close()
+                logger.error(f"Error in persistent shell session: {e}")
+                raise ConnectionError(f"Error in persistent shell session: {e}")
+        return output.replace(b"\r\n", b"\n").decode("utf-8", errors="replace")
+
+    def _write(self, data: bytes, timeout_s: float) -> None:
+        """Write data to the shell stream, waiting for the device to acknowledge each chunk."""
+        self._adb_info.read_timeout_s = timeout_s
+        chunk_size: int = self.device.max_chunk_size
+        for i in range(0, len(data), chunk_size):
+            chunk: bytes = data[i : i + chunk_size]
+            self.device._io_manager.send(
+                AdbMessage(
+                    adb_constants.WRTE,
+                    self._adb_info.local_id,
+                    self._adb_info.remote_id,
+                    chunk,
+                ),
+                self._adb_info,
+            )
+            while True:
+                cmd: bytes = self._read_packet()
+                if cmd == adb_constants.OKAY:
+                    break
+
+    def _read_packet(self) -> bytes:
+        """Read one packet for this stream, buffering any output it carries."""
+        cmd, data = self.device._read_until(
+            [adb_constants.OKAY, adb_constants.WRTE, adb_constants.CLSE],
+            self._adb_info,
+        )
+        if cmd == adb_constants.CLSE:
+            self._adb_info = None
+            raise ConnectionError("Persistent shell session closed by the device")
+        if cmd == adb_constants.WRTE:
+            self._buffer += data
+        return cmd
+
+    def _read_framed(self, begin: bytes, end: bytes, timeout_s: float) -> bytes:
+        """Read from the shell stream until the output between the sentinels is complete."""
+        start_time: float = time.time()
+        while True:
+            begin_idx: int = self._buffer.find(begin)
+            if begin_idx != -1:
+                end_idx: int = self._buffer.find(end, begin_idx)
+                if end_idx != -1:
+                    line_end: int = self._buffer.find(b"\n", end_idx)
+                    if line_end != -1:
+                        output: bytes = self._buffer[begin_idx + len(begin) : end_idx]
+                        self._buffer = self._buffer[line_end + 1 :]
+                        return output.strip(b"\r\n")
+            if time.time() - start_time > timeout_s:
+                raise TimeoutError(
+                    f"Command did not complete within {timeout_s} seconds"
+                )
+            self._read_packet()
@@ -0,0 +1,208 @@
+"""
+Continuous screen streaming for BluePyll
+"""
+
+import logging
+import time
+from collections import deque
+from threading import Condition, Event, Lock, Thread
+
+import numpy as np
+
+from .adb_pool import StreamConnection
+from .constants import BluestacksConstants
+from .exceptions import BluePyllError
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenRecordStream:
+    """
+    A continuous frame source backed by 'screenrecord' H.264 output.
+
+    A background thread runs 'screenrecord --output-format=h264 -' over a single
+    ADB stream, decodes it locally with PyAV and keeps a bounded ring of the most
+    recent frames. Frames are RGBA arrays, the same format as raw screenshots, so
+    they can be passed anywhere a screenshot is accepted.
+
+    Requires the optional 'av' package (``pip install bluepyll[stream]``).
+
+    Attributes:
+        controller: The BluePyllController to stream from
+        max_frames (int): Number of recent frames kept in the ring
+        bit_rate (int): Encoder bit rate passed to 'screenrecord'
+        size (tuple[int, int] | None): Optional encode size passed to 'screenrecord'
+    """
+
+    def __init__(
+        self,
+        controller,
+        max_frames: int = 4,
+        bit_rate: int = 8_000_000,
+        size: tuple[int, int] | None = None,
+    ) -> None:
+        """
+        Initialize a ScreenRecordStream.
+
+        Args:
+            controller: The BluePyllController to stream from
+            max_frames (int): Number of recent frames kept in the ring
+            bit_rate (int): Encoder bit rate passed to 'screenrecord'
+            size (tuple[int, int] | None): Optional encode size passed to 'screenrecord'
+        """
+        if max_frames < 1:
+            raise ValueError("max_frames must be a positive integer")
+        self.controller = controller
+        self.max_frames: int = int(max_frames)
+        self.bit_rate: int = int(bit_rate)
+        self.size: tuple[int, int] | None = size
+        self._frames: deque[np.ndarray] = deque(maxlen=self.max_frames)
+        self._frame_count: int = 0
+        self._condition: Condition = Condition()
+        self._stop_event: Event = Event()
+        self._thread: Thread | None = None
+        self._connection: StreamConnection | None = None
+        self._connection_lock: Lock = Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def frame_count(self) -> int:
+        """Total number of frames decoded since the stream started."""
+        return self._frame_count
+
+    def __enter__(self) -> "ScreenRecordStream":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _command(self) -> str:
+        command: str = f"screenrecord --output-format=h264 --bit-rate {self.bit_rate}"
+        if self.size:
+            command += f" --size {self.size[0]}x{self.size[1]}"
+        return command + " -"
+
+    def start(self) -> None:
+        """
+        Start streaming in a background thread.
+
+        Raises:
+            BluePyllError: If PyAV is not installed
+        """
+        if self.is_running:
+            return
+        try:
+            import av  # noqa: F401
+        except ImportError as e:
+            raise BluePyllError(
+                "Screen streaming requires the 'av' package. Install it with 'pip install bluepyll[stream]'."
+            ) from e
+        self._stop_event.clear()
+        self._frames.clear()
+        self._frame_count = 0
+        self._thread = Thread(
+            target=self._run, name="bluepyll-screenrecord", daemon=True
+        )
+        self._thread.start()
+        logger.debug("Screen stream started")
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        """
+        Stop streaming and wait for the background thread to exit.
+
+        The stream's connection is shut down, which ends the read the thread is
+        blocked in (a static screen produces no output) and 'screenrecord' on
+        the device.
+
+        Args:
+            timeout_s (float): Time to wait for the background thread
+        """
+        self._stop_event.set()
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.interrupt()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_s)
+            if self._thread.is_alive():
+                logger.warning(f"Screen stream did not stop within {timeout_s} seconds")
+                return
+            self._thread = None
+        logger.debug("Screen stream stopped")
+
+    def latest_frame(self, timeout_s: float | None = None) -> np.ndarray | None:
+        """
+        Get the most recently decoded frame.
+
+        Args:
+            timeout_s (float | None): Time to wait for a first frame if none has been decoded yet
+
+        Returns:
+            np.ndarray | None: A (height, width, 4) RGBA array, or None if no frame is available
+        """
+        with self._condition:
+            if not self._frames and timeout_s:
+                self._condition.wait_for(
+                    lambda: self._frames or self._stop_event.is_set(),
+                    timeout=timeout_s,
+                )
+            return self._frames[-1] if self._frames else None
+
+    def frames(self) -> list[np.ndarray]:
+        """
+        Get the frames currently held in the ring, oldest first.
+
+        Returns:
+            list[np.ndarray]: The buffered RGBA frames
+        """
+        with self._condition:
+            return list(self._frames)
+
+    def _run(self) -> None:
+        import av
+
+        # 'screenrecord' exits on its own after its time limit, so keep restarting it
+        while not self._stop_event.is_set():
+            codec = av.CodecContext.create("h264", "r")
+            # A dedicated connection keeps the video stream from delaying input
+            # commands, and from holding a bulk transfer slot for its lifetime
+            connection: StreamConnection = StreamConnection(
+                self.controller.ip, self.controller.port
+            )
+            with self._connection_lock:
+                if self._stop_event.is_set():
+                    break
+                self._connection = connection
+            try:
+                connection.connect()
+                self._decode(connection.device, codec)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning(f"Screen stream interrupted, restarting: {e}")
+                time.sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
+            finally:
+                with self._connection_lock:
+                    self._connection = None
+                connection.close()
+
+    def _decode(self, device, codec) -> None:
+        for chunk in device.streaming_shell(
+            self._command(), read_timeout_s=3600.0, decode=False
+        ):
+            if self._stop_event.is_set():
+                break
+            for packet in codec.parse(chunk):
+                for frame in codec.decode(packet):
+                    self._push(frame.to_ndarray(format="rgba"))
+
+    def _push(self, frame: np.ndarray) -> None:
+        with self._condition:
+            self._frames.append(frame)
+            self._frame_count += 1
+            self._condition.notify_all()
@@ -0,0 +1,278 @@
+"""
+Low-latency touch injection for BluePyll
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from threading import Lock
+
+from .constants import BluestacksConstants
+from .exceptions import EmulatorError
+
+logger = logging.getLogger(__name__)
+
+# Linux input event types and codes (linux/input-event-codes.h)
+EV_SYN: int = 0x00
+EV_KEY: int = 0x01
+EV_ABS: int = 0x03
+SYN_REPORT: int = 0x00
+BTN_TOUCH: int = 0x14A
+ABS_X: int = 0x00
+ABS_Y: int = 0x01
+ABS_MT_POSITION_X: int = 0x35
+ABS_MT_POSITION_Y: int = 0x36
+ABS_MT_TRACKING_ID: int = 0x39
+# A tracking id of -1 releases the contact; sendevent takes it as an unsigned value
+TRACKING_ID_RELEASE: int = 0xFFFFFFFF
+
+
+@dataclass
+class TouchDevice:
+    path: str
+    x_code: int
+    y_code: int
+    x_min: int
+    x_max: int
+    y_min: int
+    y_max: int
+    multitouch: bool
+
+
+class SendeventTouch:
+    """
+    A touch backend that writes raw input events with 'sendevent'.
+
+    'input tap' starts an 'app_process' JVM on the device for every call, while
+    'sendevent' is a tiny native binary. This backend discovers the virtual
+    touchscreen under '/dev/input' once, caches its axis ranges and the screen
+    size, and turns taps, long presses and swipes into one shell command.
+
+    Attributes:
+        controller: The BluePyllController to send events through
+    """
+
+    def __init__(self, controller) -> None:
+        """
+        Initialize a SendeventTouch.
+
+        Args:
+            controller: The BluePyllController to send events through
+        """
+        self.controller = controller
+        self._device: TouchDevice | None = None
+        self._screen_size: tuple[int, int] | None = None
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def parse_touch_device(getevent_output: str) -> TouchDevice | None:
+        """
+        Find the touchscreen in the output of 'getevent -p'.
+
+        Multi-touch devices ('ABS_MT_POSITION_X/Y') are preferred over single-touch
+        devices ('ABS_X/Y').
+
+        Args:
+            getevent_output (str): Output of 'getevent -p'
+
+        Returns:
+            TouchDevice | None: The touchscreen, or None if no device reports touch axes
+        """
+        single_touch: TouchDevice | None = None
+        for block in re.split(r"^add device \d+: ", getevent_output, flags=re.M)[1:]:
+            path: str = block.splitlines()[0].strip()
+            axes: dict[int, tuple[int, int]] = {
+                int(code, 16): (int(min_value), int(max_value))
+                for code, min_value, max_value in re.findall(
+                    r"\b([0-9a-f]{4})\s*:\s*value -?\d+, min (-?\d+), max (-?\d+)",
+                    block,
+                )
+            }
+            if ABS_MT_POSITION_X in axes and ABS_MT_POSITION_Y in axes:
+                return TouchDevice(
+                    path,
+                    ABS_MT_POSITION_X,
+                    ABS_MT_POSITION_Y,
+                    *axes[ABS_MT_POSITION_X],
+                    *axes[ABS_MT_POSITION_Y],
+                    multitouch=True,
+                )
+            if single_touch is None and ABS_X in axes and ABS_Y in axes:
+                single_touch = TouchDevice(
+                    path, ABS_X, ABS_Y, *axes[ABS_X], *axes[ABS_Y], multitouch=False
+                )
+        return single_touch
+
+    @property
+    def device(self) -> TouchDevice:
+        """
+        The touchscreen input device, discovered on first use.
+
+        Raises:
+            EmulatorError: If no touchscreen can be found
+        """
+        with self._lock:
+            if self._device is None:
+                output: str = self.controller.shell(
+                    "getevent -p", timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
+                )
+                self._device = self.parse_touch_device(output or "")
+                if self._device is None:
+                    raise EmulatorError("Could not find a touchscreen under /dev/input")
+                logger.debug(f"Touchscreen found: {self._device}")
+            return self._device
+
+    @property
+    def screen_size(self) -> tuple[int, int]:
+        """
+        The display size in pixels, as reported by 'wm size'.
+
+        Raises:
+            EmulatorError: If the display size cannot be read
+        """
+        with self._lock:
+            if self._screen_size is None:
+                output: str = self.controller.shell(
+                    "wm size", timeout_s=BluestacksConstants.DEFAULT_TIMEOUT
+                )
+                sizes: list[tuple[str, str]] = re.findall(r"(\d+)x(\d+)", output or "")
+                if not sizes:
+                    raise EmulatorError(f"Could not read the display size: {output}")
+                # An override size, when present, is listed after the physical size
+                self._screen_size = int(sizes[-1][0]), int(sizes[-1][1])
+            return self._screen_size
+
+    def reset(self) -> None:
+        """Forget the cached touchscreen and display size."""
+        with self._lock:
+            self._device = None
+            self._screen_size = None
+
+    def _to_device_coords(self, coords: tuple[int, int]) -> tuple[int, int]:
+        device: TouchDevice = self.device
+        screen_width, screen_height = self.screen_size
+        x: int = device.x_min + round(
+            coords[0] * (device.x_max - device.x_min) / max(screen_width - 1, 1)
+        )
+        y: int = device.y_min + round(
+            coords[1] * (device.y_max - device.y_min) / max(screen_height - 1, 1)
+        )
+        return (
+            min(max(x, device.x_min), device.x_max),
+            min(max(y, device.y_min), device.y_max),
+        )
+
+    def _event(self, event_type: int, code: int, value: int) -> str:
+        return f"sendevent {self.device.path} {event_type} {code} {value}"
+
+    def _down(self, coords: tuple[int, int]) -> list[str]:
+        device: TouchDevice = self.device
+        x, y = self._to_device_coords(coords)
+        events: list[str] = []
+        if device.multitouch:
+            events.append(self._event(EV_ABS, ABS_MT_TRACKING_ID, 0))
+        events += [
+            self._event(EV_KEY, BTN_TOUCH, 1),
+            self._event(EV_ABS, device.x_code, x),
+            self._event(EV_ABS, device.y_code, y),
+            self._event(EV_SYN, SYN_REPORT, 0),
+        ]
+        return events
+
+    def _move(self, coords: tuple[int, int]) -> list[str]:
+        device: TouchDevice = self.device
+        x, y = self._to_device_coords(coords)
+        return [
+            self._event(EV_ABS, device.x_code, x),
+            self._event(EV_ABS, device.y_code, y),
+            self._event(EV_SYN, SYN_REPORT, 0),
+        ]
+
+    def _up(self) -> list[str]:
+        events: list[str] = []
+        if self.device.multitouch:
+            events.append(self._event(EV_ABS, ABS_MT_TRACKING_ID, TRACKING_ID_RELEASE))
+        events += [
+            self._event(EV_KEY, BTN_TOUCH, 0),
+            self._event(EV_SYN, SYN_REPORT, 0),
+        ]
+        return events
+
+    def tap_command(self, coords: tuple[int, int], times: int = 1) -> str:
+        """
+        Build the shell command for one or more taps.
+
+        Args:
+            coords (tuple[int, int]): Screen coords of the tap
+            times (int): Number of taps
+
+        Returns:
+            str: The sendevent command sequence
+        """
+        events: list[str] = []
+        for _ in range(max(int(times), 1)):
+            events += self._down(coords) + self._up()
+        return "; ".join(events)
+
+    def long_press_command(
+        self, coords: tuple[int, int], duration_s: float = 1.0
+    ) -> str:
+        """
+        Build the shell command for a long press.
+
+        Args:
+            coords (tuple[int, int]): Screen coords of the press
+            duration_s (float): How long to hold the press
+
+        Returns:
+            str: The sendevent command sequence
+        """
+        return "; ".join(self._down(coords) + [f"sleep {duration_s}"] + self._up())
+
+    def swipe_command(
+        self,
+        start: tuple[int, int],
+        end: tuple[int, int],
+        duration_s: float = 0.3,
+        steps: int = 10,
+    ) -> str:
+        """
+        Build the shell command for a swipe.
+
+        Args:
+            start (tuple[int, int]): Screen coords where the swipe starts
+            end (tuple[int, int]): Screen coords where the swipe ends
+            duration_s (float): Total duration of the swipe
+            steps (int): Number of intermediate move events
+
+        Returns:
+            str: The sendevent command sequence
+        """
+        steps = max(int(steps), 1)
+        step_sleep: str = f"sleep {duration_s / steps:.3f}"
+        events: list[str] = self._down(start)
+        for step in range(1, steps + 1):
+            point: tuple[int, int] = (
+                round(start[0] + (end[0] - start[0]) * step / steps),
+                round(start[1] + (end[1] - start[1]) * step / steps),
+            )
+            events += [step_sleep] + self._move(point)
+        return "; ".join(events + self._up())
+
+    def tap(self, coords: tuple[int, int], times: int = 1) -> None:
+        """Tap the screen at the given coords."""
+        self.controller.send_input(self.tap_command(coords, times=times))
+
+    def long_press(self, coords: tuple[int, int], duration_s: float = 1.0) -> None:
+        """Long press the screen at the given coords."""
+        self.controller.send_input(self.long_press_command(coords, duration_s))
+
+    def swipe(
+        self,
+        start: tuple[int, int],
+        end: tuple[int, int],
+        duration_s: float = 0.3,
+        steps: int = 10,
+    ) -> None:
+        """Swipe from one point of the screen to another."""
+        self.controller.send_input(self.swipe_command(start, end, duration_s, steps))
@@ -1,18 +1,39 @@
 import logging
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from importlib.resources import files
 from io import BytesIO
 from pathlib import Path
-from time import sleep
+from threading import Lock
 
+import numpy as np
 from adb_shell.exceptions import TcpTimeoutException
 from PIL import Image
-from pyautogui import ImageNotFoundException, center, locate
 
 from .constants import BluestacksConstants
+from .exceptions import EmulatorError
+from .frames import DirtyTileTracker, frame_size, frame_to_image
+from .lazy import lazy_import
+from .matching import Match, match_template, needle_cache, to_grayscale
 from .state_machine import BluestacksState
+from .waiting import Backoff, wait_until
+
+pyautogui = lazy_import("pyautogui")
 
 logger = logging.getLogger(__name__)
 
+# OpenCV releases the GIL while matching, so one thread pool serves every controller
+_match_pool: ThreadPoolExecutor | None = None
+_match_pool_lock: Lock = Lock()
+
+
+def _get_match_pool() -> ThreadPoolExecutor:
+    global _match_pool
+    with _match_pool_lock:
+        if _match_pool is None:
+            _match_pool = ThreadPoolExecutor(thread_name_prefix="bluepyll-match")
+        return _match_pool
+
 
 class BluePyllElement:
     """
@@ -123,23 +144,16 @@ class BluePyllElement:
             )
         )
         self.controller = controller
+        # (lookup key, frame generation, result) of the last match, see 'match'
+        self._last_lookup: tuple[tuple, int, Match | None] | None = None
 
     def __repr__(self):
         return f"BluePyllElement(label={self.label}, ele_type={self.ele_type}, og_window_size={self.og_window_size}, position={self.position}, size={self.size}, path={self.path}, is_static={self.is_static}, confidence={self.confidence}, ele_txt={self.ele_txt}, pixel_color={self.pixel_color}, region={self.region}, center={self.center}, controller={self.controller})"
 
     def scale_img_to_screen(
-        self, image_path: str, screen_image: str | Image.Image | bytes
+        self, image_path: str, screen_image: str | Image.Image | bytes | np.ndarray
     ) -> Image.Image:
-        # If screen_image is bytes, convert to PIL Image
-        if isinstance(screen_image, bytes):
-            screen_image = Image.open(BytesIO(screen_image))
-
-        # If screen_image is a string (file path), open it
-        elif isinstance(screen_image, str):
-            screen_image = Image.open(screen_image)
-
-        # At this point, screen_image should be a PIL Image
-        game_screen_width, game_screen_height = screen_image.size
+        game_screen_width, game_screen_height = frame_size(screen_image)
 
         needle_img: Image.Image = Image.open(image_path)
 
@@ -157,6 +171,66 @@ class BluePyllElement:
         scaled_image: Image.Image = needle_img.resize(scaled_image_size)
         return scaled_image
 
+    def _grayscale_needle_image(
+        self, screen_image: str | Image.Image | bytes | np.ndarray
+    ) -> Image.Image:
+        """Get the cached grayscale needle for a frame as a PIL Image, for the pyautogui backend."""
+        return Image.fromarray(self.scaled_needle(frame_size(screen_image)))
+
+    def scaled_needle(
+        self, screen_size: tuple[int, int], scale: float = 1.0
+    ) -> np.ndarray:
+        """
+        Get the element's image as a grayscale array scaled to a frame size.
+
+        Needles come from the process-wide 'needle_cache', so the image is
+        decoded once and scaled once per frame size for all controllers.
+
+        Args:
+            screen_size (tuple[int, int]): The (width, height) of the frames to search
+            scale (float): Extra factor applied on top of the window-to-frame ratio
+
+        Returns:
+            np.ndarray: The grayscale needle
+        """
+        return needle_cache.get(self.path, screen_size, self.og_window_size, scale)
+
+    def _recheck_due(self, screen_size: tuple[int, int]) -> bool:
+        """Whether the learned scale's run of misses calls for a full pyramid search."""
+        # Rechecks after 1x, 2x, 4x, ... the miss limit, so an element that is
+        # just not on screen yet costs only an occasional full search
+        runs, rest = divmod(
+            self.controller.match_scale_misses.get(screen_size, 0),
+            BluestacksConstants.MATCH_SCALE_MAX_MISSES,
+        )
+        return runs > 0 and not rest and not runs & (runs - 1)
+
+    def _candidate_scales(self, screen_size: tuple[int, int]) -> list[float]:
+        """Get the scales to try, straight to the controller's winning scale if it has one."""
+        scales: Sequence[float] | None = getattr(self.controller, "match_scales", None)
+        if not scales:
+            return [1.0]
+        learned: float | None = self.controller.learned_match_scales.get(screen_size)
+        if learned is None or self._recheck_due(screen_size):
+            return list(scales)
+        return [learned]
+
+    def _learn_scale(self, screen_size: tuple[int, int], scale: float | None) -> None:
+        """Remember the best scale of a lookup, and count misses of a learned scale."""
+        learned_scales: dict[tuple[int, int], float] = (
+            self.controller.learned_match_scales
+        )
+        misses: dict[tuple[int, int], int] = self.controller.match_scale_misses
+        if scale is not None:
+            # Only a match at another scale replaces a learned scale; a miss may
+            # just mean the element is not on screen
+            if learned_scales.get(screen_size) != scale:
+                logger.debug(f"Learned match scale {scale} for {screen_size}")
+            learned_scales[screen_size] = scale
+            misses[screen_size] = 0
+        elif screen_size in learned_scales:
+            misses[screen_size] = misses.get(screen_size, 0) + 1
+
     def capture_screenshot(self):
         """Captures a screenshot using the controller."""
         return self.controller.capture_screenshot()
@@ -164,7 +238,7 @@ class BluePyllElement:
     def check_pixel_color(
         self,
         target_color: tuple[int, int, int],
-        image: bytes | str,
+        image: bytes | str | np.ndarray,
         tolerance: int = 0,
     ) -> bool:
         """Check if the pixel at (x, y) in the given image matches the target color within a tolerance."""
@@ -188,11 +262,16 @@ class BluePyllElement:
             if tolerance < 0:
                 raise ValueError("Tolerance must be a non-negative integer")
 
-            screenshot = image if image else self.capture_screenshot()
-            if not screenshot:
+            screenshot = image if image is not None else self.capture_screenshot()
+            if screenshot is None or len(screenshot) == 0:
                 raise ValueError("Failed to capture screenshot")
 
-            if isinstance(screenshot, bytes):
+            if isinstance(screenshot, np.ndarray):
+                pixel_color = tuple(
+                    int(c) for c in screenshot[coords[1], coords[0], :3]
+                )
+                return check_color_with_tolerance(pixel_color, target_color, tolerance)
+            elif isinstance(screenshot, bytes):
                 with Image.open(BytesIO(screenshot)) as image:
                     pixel_color = image.getpixel(coords)
                     return check_color_with_tolerance(
@@ -205,7 +284,7 @@ class BluePyllElement:
                         pixel_color, target_color, tolerance
                     )
             else:
-                raise ValueError("Image must be a bytes or str")
+                raise ValueError("Image must be a bytes, str or np.ndarray")
 
         except ValueError as e:
             logger.error(f"ValueError in check_pixel_color: {e}")
@@ -214,9 +293,249 @@ class BluePyllElement:
             logger.error(f"Error in check_pixel_color: {e}")
             raise ValueError(f"Error checking pixel color: {e}")
 
+    def scaled_region(
+        self,
+        screen_image: bytes | str | Image.Image | np.ndarray,
+        padding: int = 0,
+    ) -> tuple[int, int, int, int] | None:
+        """
+        Get the element's bounds in the live resolution of a frame.
+
+        The position and size are scaled from 'og_window_size' to the frame size.
+
+        Args:
+            screen_image (bytes | str | Image.Image | np.ndarray): The frame
+            padding (int): Pixels added on every side, in the live resolution
+
+        Returns:
+            tuple[int, int, int, int] | None: (left, top, width, height), or None if the element has no position
+        """
+        if not self.position or not self.size:
+            return None
+        screen_width, screen_height = frame_size(screen_image)
+        ratio_width: float = screen_width / self.og_window_size[0]
+        ratio_height: float = screen_height / self.og_window_size[1]
+        left: int = max(int(self.position[0] * ratio_width) - padding, 0)
+        top: int = max(int(self.position[1] * ratio_height) - padding, 0)
+        right: int = min(
+            round((self.position[0] + self.size[0]) * ratio_width) + padding,
+            screen_width,
+        )
+        bottom: int = min(
+            round((self.position[1] + self.size[1]) * ratio_height) + padding,
+            screen_height,
+        )
+        return (left, top, right - left, bottom - top)
+
+    def read_text(
+        self,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
+        padding: int = BluestacksConstants.OCR_REGION_PADDING,
+        **kwargs,
+    ) -> list[str]:
+        """
+        Read the text inside the element's region.
+
+        Only the element's region (see 'scaled_region') is passed to OCR, which
+        is far cheaper than reading the full frame. Elements without a position
+        are read from the full frame.
+
+        Args:
+            screenshot_img_bytes (bytes | np.ndarray | None): A frame to read instead of capturing one
+            padding (int): Pixels added around the region, in the live resolution
+            **kwargs: Additional arguments to pass to EasyOCR
+
+        Returns:
+            list[str]: The detected texts, lowercased
+        """
+        screen_image: bytes | np.ndarray | None = (
+            screenshot_img_bytes
+            if screenshot_img_bytes is not None
+            else self.capture_screenshot()
+        )
+        if screen_image is None or not len(screen_image):
+            logger.warning(f"Cannot read text of {self.label} - no screenshot")
+            return []
+        return self.controller.img_txt_checker.read_text(
+            screen_image,
+            region=self.scaled_region(screen_image, padding=padding),
+            **kwargs,
+        )
+
+    def check_text(
+        self,
+        text_to_find: str | None = None,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
+        padding: int = BluestacksConstants.OCR_REGION_PADDING,
+        **kwargs,
+    ) -> bool:
+        """
+        Check whether the element's region shows the given text.
+
+        Args:
+            text_to_find (str | None): The text to look for (default: the element's 'ele_txt')
+            screenshot_img_bytes (bytes | np.ndarray | None): A frame to read instead of capturing one
+            padding (int): Pixels added around the region, in the live resolution
+            **kwargs: Additional arguments to pass to EasyOCR
+
+        Returns:
+            bool: True if the text is found, False otherwise
+
+        Raises:
+            ValueError: If no text is given and the element has no 'ele_txt'
+        """
+        text_to_find = text_to_find if text_to_find is not None else self.ele_txt
+        if not text_to_find:
+            raise ValueError(f"BluePyllElement {self.label} has no text to check")
+        return any(
+            text_to_find.lower() in text
+            for text in self.read_text(screenshot_img_bytes, padding=padding, **kwargs)
+        )
+
+    def match(
+        self, screen_image: bytes | str | Image.Image | np.ndarray
+    ) -> Match | None:
+        """
+        Look for the element in a single screen frame with OpenCV template matching.
+
+        Static elements with a position are only searched for around that
+        position (see 'scaled_region'); other elements are searched for in the
+        whole frame.
+
+        If the controller has 'match_scales', the needle is scored at each of
+        those extra scales and the best match wins (stopping early only on a
+        near-exact score). The winning scale is remembered by the controller
+        for the frame size and later lookups at that size only try that
+        scale. After 'MATCH_SCALE_MAX_MISSES' misses in a row (then twice,
+        four times as many, ...) one lookup searches every scale again, and
+        the learned scale is only replaced if that search matches at another
+        scale.
+
+        If the controller has a 'frame_tracker', the last result is reused as
+        long as no tile of the searched region has changed since it was found.
+        The tracker advances once per frame, so looking up more elements in
+        the same frame (e.g. the cached screenshot) does not hash it again.
+
+        Args:
+            screen_image (bytes | str | Image.Image | np.ndarray): The frame to search
+
+        Returns:
+            Match | None: The best match scoring at least 'confidence', or None
+        """
+        haystack: np.ndarray = to_grayscale(screen_image)
+        tracker: DirtyTileTracker | None = getattr(
+            self.controller, "frame_tracker", None
+        )
+        return self._match_grayscale(
+            haystack,
+            (
+                tracker.update(haystack, source=screen_image)
+                if tracker is not None
+                else None
+            ),
+        )
+
+    def _match_grayscale(
+        self, haystack: np.ndarray, generation: int | None
+    ) -> Match | None:
+        """Match against a grayscale frame of the given frame tracker generation."""
+        screen_size: tuple[int, int] = (haystack.shape[1], haystack.shape[0])
+        region: tuple[int, int, int, int] | None = (
+            self.scaled_region(
+                haystack, padding=BluestacksConstants.MATCH_REGION_PADDING
+            )
+            if self.is_static
+            else None
+        )
+        scales: list[float] = self._candidate_scales(screen_size)
+        # Other scales are searched for in the whole frame (see below)
+        searched_region: tuple[int, int, int, int] | None = (
+            region if scales == [1.0] else None
+        )
+        lookup_key: tuple = (
+            screen_size,
+            searched_region,
+            tuple(scales),
+            self.confidence,
+        )
+        last_lookup = self._last_lookup
+        if (
+            generation is not None
+            and last_lookup is not None
+            and last_lookup[0] == lookup_key
+            and not self.controller.frame_tracker.changed_since(
+                last_lookup[1], searched_region
+            )
+        ):
+            return last_lookup[2]
+        result: Match | None = None
+        result_scale: float | None = None
+        for scale in scales:
+            match: Match | None = match_template(
+                haystack,
+                self.scaled_needle(screen_size, scale),
+                confidence=self.confidence,
+                # The region only holds if the frame is a uniform rescale of the window
+                region=region if scale == 1.0 else None,
+            )
+            if match is not None and (result is None or match.score > result.score):
+                result, result_scale = match, scale
+                # A neighbouring scale can clear a low confidence too, so keep
+                # scoring the others unless this match is as good as exact
+                if match.score >= BluestacksConstants.MATCH_SCALE_EXACT_SCORE:
+                    break
+        if getattr(self.controller, "match_scales", None):
+            self._learn_scale(screen_size, result_scale)
+        if generation is not None:
+            self._last_lookup = (lookup_key, generation, result)
+        return result
+
+    def locate(
+        self, screen_image: bytes | str | Image.Image | np.ndarray
+    ) -> tuple[int, int] | None:
+        """
+        Look for the element in a single screen frame, without retries.
+
+        The controller's 'match_backend' picks the matcher: "opencv" (see
+        'match') or "pyautogui".
+
+        Args:
+            screen_image (bytes | str | Image.Image | np.ndarray): The frame to search
+
+        Returns:
+            tuple[int, int] | None: The coords of the center of the element, or None if not found
+        """
+        backend: str = getattr(
+            self.controller, "match_backend", BluestacksConstants.MATCH_BACKEND
+        )
+        if backend == "opencv":
+            match: Match | None = self.match(screen_image)
+            if match is None:
+                return None
+            logger.debug(f"BluePyllElement {self.label} found at: {match}")
+            return match.center
+        haystack_img: Image.Image = frame_to_image(screen_image)
+        # pyautogui matches in grayscale, so the cached grayscale needle is enough
+        scaled_img: Image.Image = self._grayscale_needle_image(haystack_img)
+        try:
+            ui_location: tuple[int, int, int, int] | None = pyautogui.locate(
+                needleImage=scaled_img,
+                haystackImage=haystack_img,
+                confidence=self.confidence,
+                grayscale=True,
+                region=self.region,
+            )
+        except pyautogui.ImageNotFoundException:
+            return None
+        if not ui_location:
+            return None
+        logger.debug(f"BluePyllElement {self.label} found at: {ui_location}")
+        ui_x_coord, ui_y_coord = pyautogui.center(ui_location)
+        return (ui_x_coord, ui_y_coord)
+
     def where(
         self,
-        screenshot_img_bytes: bytes = None,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
         max_retries: int = 2,
     ) -> tuple[int, int] | None:
         # Ensure Bluestacks is loading or ready before trying to find UI element
@@ -232,16 +551,12 @@ class BluePyllElement:
                 logger.debug(
                     f"Looking for BluePyllElement: {self.label} with confidence of {self.confidence}..."
                 )
-                find_ui_retries: int = 0
-                while (
-                    (find_ui_retries < max_retries)
-                    if max_retries is not None and max_retries > 0
-                    else True
-                ):
+
+                def find_ui_element() -> tuple[int, int] | None:
                     try:
-                        screen_image: bytes | None = (
+                        screen_image: bytes | np.ndarray | None = (
                             screenshot_img_bytes
-                            if screenshot_img_bytes
+                            if screenshot_img_bytes is not None
                             else (
                                 self.controller._capture_loading_screen()
                                 if self.path
@@ -249,35 +564,30 @@ class BluePyllElement:
                                 else self.capture_screenshot()
                             )
                         )
-                        if screen_image:
-                            haystack_img: Image.Image = Image.open(
-                                BytesIO(screen_image)
-                            )
-                            scaled_img: Image.Image = self.scale_img_to_screen(
-                                image_path=self.path,
-                                screen_image=haystack_img,
-                            )
-                            ui_location: tuple[int, int, int, int] | None = locate(
-                                needleImage=scaled_img,
-                                haystackImage=haystack_img,
-                                confidence=self.confidence,
-                                grayscale=True,
-                                region=self.region,
-                            )
-                            if ui_location:
-                                logger.debug(
-                                    f"BluePyllElement {self.label} found at: {ui_location}"
-                                )
-                                ui_x_coord, ui_y_coord = center(ui_location)
-                                return (ui_x_coord, ui_y_coord)
-                    except ImageNotFoundException or TcpTimeoutException:
-                        find_ui_retries += 1
-                        logger.debug(
-                            f"BluePyllElement {self.label} not found. Retrying... ({find_ui_retries}/{max_retries})"
+                        if screen_image is not None and len(screen_image):
+                            return self.locate(screen_image)
+                    except TcpTimeoutException as e:
+                        logger.debug(f"Timed out capturing screenshot: {e}")
+                    logger.debug(f"BluePyllElement {self.label} not found.")
+                    return None
+
+                # A provided screenshot never changes, so it is only searched once
+                ui_coords: tuple[int, int] | None = wait_until(
+                    find_ui_element,
+                    backoff=Backoff.fixed(BluestacksConstants.DEFAULT_WAIT_TIME),
+                    max_attempts=(
+                        1
+                        if screenshot_img_bytes is not None
+                        else (
+                            max_retries
+                            if max_retries is not None and max_retries > 0
+                            else None
                         )
-                        sleep(BluestacksConstants.DEFAULT_WAIT_TIME)
-                        continue
-
+                    ),
+                    label="where",
+                )
+                if ui_coords:
+                    return ui_coords
                 logger.debug(f"Wasn't able to find BluePyllElement: {self.label}")
                 return None
 
@@ -285,6 +595,7 @@ class BluePyllElement:
         self,
         coords: tuple[int, int],
         times: int = 1,
+        use_sendevent: bool | None = None,
     ) -> bool:
         # Ensure Bluestacks is ready before trying to click coords
         match self.controller.bluestacks_state.current_state:
@@ -298,14 +609,29 @@ class BluePyllElement:
                         "ADB device not connected. Skipping 'click_coords' method call."
                     )
                     return False
+                use_sendevent = (
+                    self.controller.use_sendevent
+                    if use_sendevent is None
+                    else use_sendevent
+                )
+                if use_sendevent:
+                    try:
+                        self.controller.send_input(
+                            self.controller.touch.tap_command(coords, times=times)
+                        )
+                        logger.debug(
+                            f"Click event sent via sendevent at coords x={coords[0]}, y={coords[1]}"
+                        )
+                        return True
+                    except EmulatorError as e:
+                        logger.warning(
+                            f"sendevent touch unavailable, falling back to 'input tap': {e}"
+                        )
                 tap_command: str = f"input tap {coords[0]} {coords[1]}"
                 for _ in range(times - 1):
                     tap_command += f" && input tap {coords[0]} {coords[1]}"
 
-                self.controller.shell(
-                    tap_command,
-                    timeout_s=BluestacksConstants.DEFAULT_TIMEOUT,
-                )
+                self.controller.send_input(tap_command)
                 logger.debug(
                     f"Click event sent via ADB at coords x={coords[0]}, y={coords[1]}"
                 )
@@ -314,8 +640,9 @@ class BluePyllElement:
     def click(
         self,
         times: int = 1,
-        screenshot_img_bytes: bytes | None = None,
+        screenshot_img_bytes: bytes | np.ndarray | None = None,
         max_tries: int = 2,
+        use_sendevent: bool | None = None,
     ) -> bool:
         # Ensure Bluestacks is ready before trying to click ui
         match self.controller.bluestacks_state.current_state:
@@ -335,7 +662,7 @@ class BluePyllElement:
                 if not coord:
                     logger.debug(f"UI element {self.label} not found")
                     return False
-                if self.click_coord(coord, times=times):
+                if self.click_coord(coord, times=times, use_sendevent=use_sendevent):
                     logger.debug(
                         f"Click event sent via ADB at coords x={coord[0]}, y={coord[1]}"
                     )
@@ -373,7 +700,7 @@ class BluePyllElements:
             label="bluestacks_my_games_buttoon",
             ele_type="button",
             og_window_size=self.bluepyll_controller.ref_window_size,
-            path=files("bluepyll.assets").joinpath("bluestacks_my_games_buttoon.png"),
+            path=files("bluepyll.assets").joinpath("bluestacks_my_games_button.png"),
             confidence=0.6,
             ele_txt="My games",
             controller=self.bluepyll_controller,
@@ -432,3 +759,59 @@ class BluePyllElements:
             confidence=0.99,
             controller=self.bluepyll_controller,
         )
+
+        self.warm_up()
+
+    def warm_up(self) -> None:
+        """Decode every element image into the shared needle cache at the reference window size."""
+        for element in vars(self).values():
+            if isinstance(element, BluePyllElement) and element.path:
+                try:
+                    element.scaled_needle(element.og_window_size)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not load image of {element.label}: {e}")
+
+
+def locate_many(
+    elements: Sequence[BluePyllElement],
+    screen_image: bytes | str | Image.Image | np.ndarray,
+) -> list[Match | None]:
+    """
+    Look for many elements in one screen frame at once.
+
+    The frame is decoded and converted to grayscale once, and the elements are
+    matched against it in parallel on a shared thread pool, so checking many
+    elements costs about as much wall time as checking one. Matching always
+    uses OpenCV (see 'BluePyllElement.match'), and each controller's frame
+    tracker is updated once for the frame.
+
+    Args:
+        elements (Sequence[BluePyllElement]): The elements to look for
+        screen_image (bytes | str | Image.Image | np.ndarray): The frame to search
+
+    Returns:
+        list[Match | None]: The match of each element, in order; None for elements
+            that were not found or have no image
+    """
+    haystack: np.ndarray = to_grayscale(screen_image)
+    generations: dict[int, int] = {}
+    for element in elements:
+        tracker: DirtyTileTracker | None = getattr(
+            element.controller, "frame_tracker", None
+        )
+        if tracker is not None and id(tracker) not in generations:
+            generations[id(tracker)] = tracker.update(haystack, source=screen_image)
+
+    def match_element(element: BluePyllElement) -> Match | None:
+        if not element.path:
+            return None
+        tracker: DirtyTileTracker | None = getattr(
+            element.controller, "frame_tracker", None
+        )
+        return element._match_grayscale(
+            haystack, generations[id(tracker)] if tracker is not None else None
+        )
+
+    if len(elements) <= 1:
+        return [match_element(element) for element in elements]
+    return list(_get_match_pool().map(match_element, elements))
@@ -1,10 +1,138 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
 from pathlib import Path
+from threading import Lock, Thread
 from typing import Any
 
-import cv2
-import easyocr
 import numpy as np
 
+from .constants import BluestacksConstants
+from .lazy import lazy_import
+
+# EasyOCR pulls in torch, so both it and OpenCV are only imported when OCR is used
+cv2 = lazy_import("cv2")
+easyocr = lazy_import("easyocr")
+
+logger = logging.getLogger(__name__)
+
+
+class OcrCache:
+    """
+    A bounded LRU cache of OCR results keyed by a hash of the OCR input.
+
+    The key covers the preprocessed (grayscale, cropped) pixels, their shape
+    and the OCR arguments, so an unchanged region is only ever read once.
+    Least recently used entries are evicted once the cached results exceed
+    'max_bytes'.
+
+    Attributes:
+        max_bytes (int): Size budget for cached results; 0 disables caching
+        hits (int): Number of reads served from the cache
+        misses (int): Number of reads that had to run OCR
+    """
+
+    # Approximate per-entry bookkeeping cost (key, list and dict slot)
+    ENTRY_OVERHEAD_BYTES: int = 128
+
+    def __init__(
+        self, max_bytes: int = BluestacksConstants.OCR_CACHE_MAX_BYTES
+    ) -> None:
+        """
+        Initialize an OcrCache.
+
+        Args:
+            max_bytes (int): Size budget for cached results; 0 disables caching
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be a non-negative integer")
+        self.max_bytes: int = int(max_bytes)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[bytes, tuple[list[str], int]] = OrderedDict()
+        self._size: int = 0
+        self._lock: Lock = Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate size of the cached results."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(image: np.ndarray, kwargs: dict[str, Any]) -> bytes:
+        """
+        Hash an OCR input.
+
+        Args:
+            image (np.ndarray): The preprocessed image
+            kwargs (dict[str, Any]): The OCR arguments
+
+        Returns:
+            bytes: The cache key
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(
+            repr((image.shape, str(image.dtype), sorted(kwargs.items()))).encode()
+        )
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.digest()
+
+    def get(self, key: bytes) -> list[str] | None:
+        """
+        Get cached texts.
+
+        Args:
+            key (bytes): The cache key
+
+        Returns:
+            list[str] | None: The cached texts, or None on a miss
+        """
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, key: bytes, texts: list[str]) -> None:
+        """
+        Store texts, evicting least recently used entries if over budget.
+
+        Args:
+            key (bytes): The cache key
+            texts (list[str]): The texts read from the image
+        """
+        if self.max_bytes <= 0:
+            return
+        size: int = (
+            self.ENTRY_OVERHEAD_BYTES + len(key) + sum(len(text) for text in texts)
+        )
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (list(texts), size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
 
 class ImageTextChecker:
     """
@@ -15,23 +143,104 @@ class ImageTextChecker:
     - Extract all text from images
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        warm_up: bool = False,
+        cache_max_bytes: int = BluestacksConstants.OCR_CACHE_MAX_BYTES,
+    ) -> None:
         """
         Initialize the ImageTextChecker.
 
-        Uses EasyOCR with English language support for text detection.
+        Uses EasyOCR with English language support for text detection. The
+        EasyOCR reader and its models are loaded on first use.
+
+        Args:
+            warm_up (bool): Whether to start loading the reader in a background thread right away
+            cache_max_bytes (int): Size budget of the OCR result cache; 0 disables it
         """
-        self.reader: easyocr.Reader = easyocr.Reader(lang_list=["en"], verbose=False)
+        self.cache: OcrCache = OcrCache(max_bytes=cache_max_bytes)
+        self._reader = None
+        self._reader_lock: Lock = Lock()
+        if warm_up:
+            self.warm_up()
+
+    @property
+    def reader(self) -> "easyocr.Reader":
+        """The EasyOCR reader, built the first time it is needed."""
+        if self._reader is None:
+            with self._reader_lock:
+                if self._reader is None:
+                    logger.debug("Loading EasyOCR reader...")
+                    self._reader = easyocr.Reader(lang_list=["en"], verbose=False)
+        return self._reader
+
+    def warm_up(self) -> Thread:
+        """
+        Load the EasyOCR reader in a background thread.
+
+        Returns:
+            Thread: The loading thread
+        """
+        thread: Thread = Thread(
+            target=lambda: self.reader, name="bluepyll-ocr-warm-up", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _load_grayscale(
+        self, image_path: Path | bytes | str | np.ndarray
+    ) -> np.ndarray:
+        """
+        Load an image as a grayscale array for OCR.
+
+        Args:
+            image_path (Path | bytes | str | np.ndarray): Path to the image file, encoded
+                image bytes, or an RGBA/RGB array (e.g. a raw screenshot)
+
+        Returns:
+            np.ndarray: The grayscale image
+
+        Raises:
+            ValueError: If the image cannot be read
+        """
+        # Handle different input types
+        if isinstance(image_path, np.ndarray):
+            # Raw screenshots are RGBA (or RGB) arrays
+            match image_path.ndim, image_path.shape[-1]:
+                case 2, _:
+                    return image_path
+                case 3, 4:
+                    return cv2.cvtColor(image_path, cv2.COLOR_RGBA2GRAY)
+                case _:
+                    return cv2.cvtColor(image_path, cv2.COLOR_RGB2GRAY)
+        elif isinstance(image_path, bytes):
+            # Convert bytes to numpy array
+            nparr = np.frombuffer(image_path, np.uint8)
+            image: np.ndarray = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        else:
+            # Read the image using OpenCV
+            image: np.ndarray = cv2.imread(str(image_path))
+
+        if image is None:
+            raise ValueError(f"Could not read image from {image_path}")
+
+        # Convert image to grayscale
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     def check_text(
-        self, text_to_find: str, image_path: Path | bytes | str, **kwargs
+        self,
+        text_to_find: str,
+        image_path: Path | bytes | str | np.ndarray,
+        region: tuple[int, int, int, int] | None = None,
+        **kwargs,
     ) -> bool:
         """
         Check if the specified text is present in the image.
 
         Args:
             text_to_find (str): Text to search for in the image
-            image_path (Path): Path to the image file
+            image_path (Path | bytes | str | np.ndarray): Path to the image file, or image bytes, or a raw screenshot array
+            region (tuple[int, int, int, int] | None): Optional (left, top, width, height) region to restrict OCR to
             **kwargs: Additional arguments to pass to EasyOCR
 
         Returns:
@@ -42,26 +251,9 @@ class ImageTextChecker:
             TypeError: If invalid arguments are provided
         """
         try:
-            # Handle different input types
-            if isinstance(image_path, bytes):
-                # Convert bytes to numpy array
-                nparr = np.frombuffer(image_path, np.uint8)
-                image: cv2.typing.MatLike = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            else:
-                # Read the image using OpenCV
-                image: cv2.typing.MatLike = cv2.imread(str(image_path))
-
-            if image is None:
-                raise ValueError(f"Could not read image from {image_path}")
-
-            # Convert image to grayscale
-            image: cv2.typing.MatLike = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-            # Use EasyOCR to do text detection
-            results: list[list[Any]] = self.reader.readtext(image, **kwargs)
-
-            # Extract the text from the results
-            extracted_texts: list[str] = [str(result[1]).lower() for result in results]
+            extracted_texts: list[str] = self.read_text(
+                image_path, region=region, **kwargs
+            )
 
             # Check if the specified text is in the extracted texts
             return any(text_to_find.lower() in text for text in extracted_texts)
@@ -69,12 +261,18 @@ class ImageTextChecker:
         except Exception as e:
             raise ValueError(f"Error checking text in image: {e}")
 
-    def read_text(self, image_path: Path | bytes | str, **kwargs) -> list[str]:
+    def read_text(
+        self,
+        image_path: Path | bytes | str | np.ndarray,
+        region: tuple[int, int, int, int] | None = None,
+        **kwargs,
+    ) -> list[str]:
         """
         Read text from the image.
 
         Args:
-            image_path (Path | bytes | str): Path to the image file, or image bytes, or image path
+            image_path (Path | bytes | str | np.ndarray): Path to the image file, or image bytes, or a raw screenshot array
+            region (tuple[int, int, int, int] | None): Optional (left, top, width, height) region to restrict OCR to
             **kwargs: Additional arguments to pass to EasyOCR
 
         Returns:
@@ -85,28 +283,204 @@ class ImageTextChecker:
             TypeError: If invalid arguments are provided
         """
         try:
-            # Handle different input types
-            if isinstance(image_path, bytes):
-                # Convert bytes to numpy array
-                nparr = np.frombuffer(image_path, np.uint8)
-                image: cv2.typing.MatLike = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            else:
-                # Read the image using OpenCV
-                image: cv2.typing.MatLike = cv2.imread(str(image_path))
+            image: np.ndarray = self._load_grayscale(image_path)
+            if region is not None:
+                image = self._crop(image, region)
+            return self._read_grayscale(image, **kwargs)
 
-            if image is None:
-                raise ValueError(f"Could not read image from {image_path}")
+        except Exception as e:
+            raise ValueError(f"Error reading text from image: {e}")
 
-            # Convert image to grayscale
-            image: cv2.typing.MatLike = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    def _read_grayscale(self, image: np.ndarray, **kwargs) -> list[str]:
+        """
+        Run OCR on an image that is already grayscale.
 
-            # Use EasyOCR to do text detection
-            results: list[list[Any]] = self.reader.readtext(image, **kwargs)
+        Args:
+            image (np.ndarray): The grayscale image
+            **kwargs: Additional arguments to pass to EasyOCR
 
+        Returns:
+            list[str]: list of detected texts, lowercased
+        """
+        return self._read_grayscale_batch([image], **kwargs)[0]
+
+    def _read_grayscale_batch(
+        self, images: Sequence[np.ndarray], **kwargs
+    ) -> list[list[str]]:
+        """
+        Run OCR on several grayscale images, serving unchanged ones from the cache.
+
+        Args:
+            images (Sequence[np.ndarray]): The grayscale images
+            **kwargs: Additional arguments to pass to EasyOCR
+
+        Returns:
+            list[list[str]]: The detected texts of each image, lowercased
+        """
+        if self.cache.max_bytes <= 0:
+            return self._infer_batch(images, **kwargs)
+        keys: list[bytes] = [OcrCache.key(image, kwargs) for image in images]
+        results: list[list[str] | None] = [self.cache.get(key) for key in keys]
+        missing: list[int] = [i for i, texts in enumerate(results) if texts is None]
+        if missing:
+            inferred: list[list[str]] = self._infer_batch(
+                [images[i] for i in missing], **kwargs
+            )
+            for i, texts in zip(missing, inferred):
+                self.cache.put(keys[i], texts)
+                results[i] = texts
+        return results
+
+    def _infer_batch(self, images: Sequence[np.ndarray], **kwargs) -> list[list[str]]:
+        """
+        Run EasyOCR on several grayscale images, batching images of similar size.
+
+        EasyOCR batches only equally sized images, so images are grouped into
+        size buckets ('OCR_BATCH_BUCKET_PX' steps) and each bucket runs as one
+        batch, with its images padded to the bucket size with their background
+        color. A large image therefore never inflates the small ones.
+
+        Args:
+            images (Sequence[np.ndarray]): The grayscale images
+            **kwargs: Additional arguments to pass to EasyOCR
+
+        Returns:
+            list[list[str]]: The detected texts of each image, lowercased
+        """
+        step: int = BluestacksConstants.OCR_BATCH_BUCKET_PX
+        buckets: dict[tuple[int, int], list[int]] = {}
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            buckets.setdefault(
+                (-(-height // step) * step, -(-width // step) * step), []
+            ).append(i)
+        texts: list[list[str]] = [[] for _ in images]
+        for (height, width), indices in buckets.items():
+            if len(indices) == 1:
+                # Use EasyOCR to do text detection
+                batch_results: list[list[list[Any]]] = [
+                    self.reader.readtext(images[indices[0]], **kwargs)
+                ]
+            else:
+                batch_results = self.reader.readtext_batched(
+                    [self._pad(images[i], height, width) for i in indices], **kwargs
+                )
             # Extract the text from the results
-            extracted_texts: list[str] = [str(result[1]).lower() for result in results]
+            for i, results in zip(indices, batch_results):
+                texts[i] = [str(result[1]).lower() for result in results]
+        return texts
+
+    @staticmethod
+    def _pad(image: np.ndarray, height: int, width: int) -> np.ndarray:
+        """Pad an image at the bottom and right to a size with its background (median border) color."""
+        border: np.ndarray = np.concatenate(
+            (image[0], image[-1], image[:, 0], image[:, -1])
+        )
+        return np.pad(
+            image,
+            ((0, height - image.shape[0]), (0, width - image.shape[1])),
+            mode="constant",
+            constant_values=int(np.median(border)),
+        )
+
+    def _load_grayscale_batch(
+        self,
+        images: (
+            Sequence[Path | bytes | str | np.ndarray] | Path | bytes | str | np.ndarray
+        ),
+        regions: Sequence[tuple[int, int, int, int]] | None = None,
+    ) -> list[np.ndarray]:
+        if regions is None:
+            return [self._load_grayscale(image) for image in images]
+        # Many crops of one frame: decode the frame once
+        frame: np.ndarray = self._load_grayscale(images)
+        return [self._crop(frame, region) for region in regions]
 
-            return extracted_texts
+    @staticmethod
+    def _crop(image: np.ndarray, region: tuple[int, int, int, int]) -> np.ndarray:
+        """
+        Crop an image to a (left, top, width, height) region, clipped to the image.
+
+        Raises:
+            ValueError: If the region does not overlap the image
+        """
+        left, top, width, height = region
+        crop: np.ndarray = image[
+            max(top, 0) : max(top + height, 0), max(left, 0) : max(left + width, 0)
+        ]
+        if not crop.size:
+            raise ValueError(f"Region {region} is outside the image")
+        return crop
+
+    def read_text_batch(
+        self,
+        images: (
+            Sequence[Path | bytes | str | np.ndarray] | Path | bytes | str | np.ndarray
+        ),
+        regions: Sequence[tuple[int, int, int, int]] | None = None,
+        **kwargs,
+    ) -> list[list[str]]:
+        """
+        Read text from many images, or from many regions of one image, in one batched call.
+
+        Args:
+            images: The images (paths, image bytes or raw screenshot arrays), or a
+                single image if 'regions' is given
+            regions (Sequence[tuple[int, int, int, int]] | None): (left, top, width, height)
+                regions to crop from the single image
+            **kwargs: Additional arguments to pass to EasyOCR
+
+        Returns:
+            list[list[str]]: The detected texts of each image or region, in input order
 
+        Raises:
+            ValueError: If an image cannot be read or a region is outside the image
+        """
+        try:
+            return self._read_grayscale_batch(
+                self._load_grayscale_batch(images, regions), **kwargs
+            )
         except Exception as e:
-            raise ValueError(f"Error reading text from image: {e}")
+            raise ValueError(f"Error reading text from images: {e}")
+
+    def check_text_batch(
+        self,
+        texts_to_find: Sequence[str] | str,
+        images: (
+            Sequence[Path | bytes | str | np.ndarray] | Path | bytes | str | np.ndarray
+        ),
+        regions: Sequence[tuple[int, int, int, int]] | None = None,
+        **kwargs,
+    ) -> list[bool]:
+        """
+        Check many images, or many regions of one image, for text in one batched call.
+
+        Args:
+            texts_to_find (Sequence[str] | str): The text to look for in each image or
+                region, or one text to look for in all of them
+            images: The images (paths, image bytes or raw screenshot arrays), or a
+                single image if 'regions' is given
+            regions (Sequence[tuple[int, int, int, int]] | None): (left, top, width, height)
+                regions to crop from the single image
+            **kwargs: Additional arguments to pass to EasyOCR
+
+        Returns:
+            list[bool]: Whether each image or region contains its text, in input order
+
+        Raises:
+            ValueError: If an image cannot be read, a region is outside the image, or
+                the number of texts does not match the number of images or regions
+        """
+        extracted_texts: list[list[str]] = self.read_text_batch(
+            images, regions, **kwargs
+        )
+        if isinstance(texts_to_find, str):
+            texts_to_find = [texts_to_find] * len(extracted_texts)
+        if len(texts_to_find) != len(extracted_texts):
+            raise ValueError(
+                f"Expected {len(extracted_texts)} texts to find, got {len(texts_to_find)}"
+            )
+        return [
+            any(text_to_find.lower() in text for text in texts)
+            for text_to_find, texts in zip(texts_to_find, extracted_texts)
+        ]
@@ -0,0 +1,224 @@
+"""
+Polling with adaptive backoff for BluePyll
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Backoff:
+    """
+    A growing sequence of poll intervals.
+
+    Attributes:
+        initial_s (float): The first interval
+        factor (float): Multiplier applied after each interval
+        max_s (float): Upper bound for a single interval
+    """
+
+    initial_s: float = 0.05
+    factor: float = 2.0
+    max_s: float = 1.0
+
+    @classmethod
+    def fixed(cls, interval_s: float) -> "Backoff":
+        """
+        Build a backoff that always waits the same interval.
+
+        Attempt-limited retries use it to keep their old time window.
+
+        Args:
+            interval_s (float): The interval in seconds
+
+        Returns:
+            Backoff: The fixed backoff
+        """
+        return cls(initial_s=interval_s, factor=1.0, max_s=interval_s)
+
+    def intervals(self) -> Iterator[float]:
+        """
+        Yield poll intervals forever, growing from 'initial_s' up to 'max_s'.
+
+        Yields:
+            float: The next interval in seconds
+        """
+        interval: float = min(self.initial_s, self.max_s)
+        while True:
+            yield interval
+            interval = min(interval * self.factor, self.max_s)
+
+
+DEFAULT_BACKOFF: Backoff = Backoff()
+
+
+@dataclass
+class WaitRecord:
+    """
+    Accumulated timings for waits sharing a label.
+
+    Attributes:
+        count (int): Number of waits
+        satisfied (int): Number of waits whose condition became true
+        total_s (float): Total time spent waiting
+        max_s (float): Longest single wait
+    """
+
+    count: int = 0
+    satisfied: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+
+@dataclass
+class WaitStats:
+    """
+    Thread-safe record of how long each kind of wait took.
+
+    Attributes:
+        records (dict[str, WaitRecord]): Timings, keyed by wait label
+    """
+
+    records: dict[str, WaitRecord] = field(default_factory=dict)
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def record(self, label: str, elapsed_s: float, satisfied: bool) -> None:
+        """
+        Record one finished wait.
+
+        Args:
+            label (str): The wait label
+            elapsed_s (float): How long the wait took
+            satisfied (bool): Whether the condition became true
+        """
+        with self._lock:
+            record: WaitRecord = self.records.setdefault(label, WaitRecord())
+            record.count += 1
+            record.satisfied += int(satisfied)
+            record.total_s += elapsed_s
+            record.max_s = max(record.max_s, elapsed_s)
+
+    def snapshot(self) -> dict[str, WaitRecord]:
+        """
+        Get a copy of the current timings.
+
+        Returns:
+            dict[str, WaitRecord]: Timings, keyed by wait label
+        """
+        with self._lock:
+            return {
+                label: WaitRecord(**vars(record))
+                for label, record in self.records.items()
+            }
+
+    def reset(self) -> None:
+        """Forget every recorded wait."""
+        with self._lock:
+            self.records.clear()
+
+
+# Process-wide wait timings, filled in by every 'wait_until' call
+wait_stats: WaitStats = WaitStats()
+
+
+def _finish(label: str, start_time: float, result: Any) -> Any:
+    elapsed_s: float = time.monotonic() - start_time
+    wait_stats.record(label, elapsed_s, bool(result))
+    logger.debug(
+        f"Wait '{label}' {'succeeded' if result else 'gave up'} after {elapsed_s:.3f}s"
+    )
+    return result
+
+
+def _should_stop(
+    attempts: int, max_attempts: int | None, start_time: float, deadline: float | None
+) -> float | None:
+    """Return the time left before the next poll, or None if waiting should stop."""
+    if max_attempts is not None and attempts >= max_attempts:
+        return None
+    if deadline is None:
+        return float("inf")
+    remaining_s: float = deadline - (time.monotonic() - start_time)
+    return remaining_s if remaining_s > 0 else None
+
+
+def wait_until(
+    predicate: Callable[[], Any],
+    deadline: float | None = None,
+    backoff: Backoff = DEFAULT_BACKOFF,
+    max_attempts: int | None = None,
+    label: str | None = None,
+) -> Any:
+    """
+    Poll a condition until it is true, sleeping for growing intervals in between.
+
+    The predicate is checked immediately, so a condition that already holds
+    costs no sleep at all.
+
+    Args:
+        predicate (Callable[[], Any]): The condition; any truthy result ends the wait
+        deadline (float | None): Maximum time to wait in seconds (None waits indefinitely)
+        backoff (Backoff): The poll intervals
+        max_attempts (int | None): Maximum number of times to check the predicate
+        label (str | None): Name under which the wait is recorded in 'wait_stats'
+
+    Returns:
+        Any: The predicate's last result (falsy if the wait gave up)
+    """
+    label = label or getattr(predicate, "__name__", "wait")
+    start_time: float = time.monotonic()
+    attempts: int = 0
+    for interval in backoff.intervals():
+        result: Any = predicate()
+        attempts += 1
+        if result:
+            return _finish(label, start_time, result)
+        remaining_s: float | None = _should_stop(
+            attempts, max_attempts, start_time, deadline
+        )
+        if remaining_s is None:
+            return _finish(label, start_time, result)
+        time.sleep(min(interval, remaining_s))
+
+
+async def async_wait_until(
+    predicate: Callable[[], Awaitable[Any]],
+    deadline: float | None = None,
+    backoff: Backoff = DEFAULT_BACKOFF,
+    max_attempts: int | None = None,
+    label: str | None = None,
+) -> Any:
+    """
+    Asyncio version of 'wait_until' for a coroutine predicate.
+
+    Args:
+        predicate (Callable[[], Awaitable[Any]]): The condition; any truthy result ends the wait
+        deadline (float | None): Maximum time to wait in seconds (None waits indefinitely)
+        backoff (Backoff): The poll intervals
+        max_attempts (int | None): Maximum number of times to check the predicate
+        label (str | None): Name under which the wait is recorded in 'wait_stats'
+
+    Returns:
+        Any: The predicate's last result (falsy if the wait gave up)
+    """
+    label = label or getattr(predicate, "__name__", "wait")
+    start_time: float = time.monotonic()
+    attempts: int = 0
+    for interval in backoff.intervals():
+        result: Any = await predicate()
+        attempts += 1
+        if result:
+            return _finish(label, start_time, result)
+        remaining_s: float | None = _should_stop(
+            attempts, max_attempts, start_time, deadline
+        )
+        if remaining_s is None:
+            return _finish(label, start_time, result)
+        await asyncio.sleep(min(interval, remaining_s))
@@ -0,0 +1,210 @@
+"""
+Fixture-based tests for the parsers of ADB command output.
+
+These run without an emulator: each parser is fed captured 'dumpsys',
+'getprop', 'getevent' or 'screencap' output. Run them with:
+
+    python -m unittest tests.test_parsers
+"""
+
+import re
+import struct
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from bluepyll.app import AppStatus
+from bluepyll.boot import BootStatus
+from bluepyll.frames import BGRA_8888, RGBA_8888, RGBX_8888, parse_raw_screencap
+from bluepyll.touch import (
+    ABS_MT_POSITION_X,
+    ABS_MT_POSITION_Y,
+    ABS_X,
+    ABS_Y,
+    SendeventTouch,
+)
+
+FIXTURES: Path = Path(__file__).parent / "fixtures"
+
+APP: str = "com.revomon.vr"
+LAUNCHER: str = "com.bluestacks.launcher"
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def app_status_output(pids: str, dumpsys: str) -> str:
+    """Build what 'AppStatus.command' prints, with the device-side grep applied."""
+    resumed_lines: list[str] = [
+        line
+        for line in dumpsys.splitlines()
+        if re.match(AppStatus._RESUMED_ACTIVITY_PATTERN, line)
+    ]
+    return "\n".join([pids, AppStatus._SEPARATOR, *resumed_lines])
+
+
+class AppStatusTest(unittest.TestCase):
+    # (fixture, package in front, package that was last resumed)
+    DUMPSYS_FIXTURES: list[tuple[str, str, str]] = [
+        ("dumpsys_activities_android9.txt", APP, LAUNCHER),
+        ("dumpsys_activities_android11.txt", LAUNCHER, APP),
+        ("dumpsys_activities_android12.txt", APP, LAUNCHER),
+    ]
+
+    def test_focused_app(self):
+        for fixture, focused, _ in self.DUMPSYS_FIXTURES:
+            with self.subTest(fixture=fixture):
+                output: str = app_status_output("4321", read_fixture(fixture))
+                status: AppStatus = AppStatus.from_output(focused, output)
+                self.assertEqual(
+                    status, AppStatus(running=True, focused=True, pid=4321)
+                )
+
+    def test_last_resumed_app_is_not_focused(self):
+        for fixture, _, last_resumed in self.DUMPSYS_FIXTURES:
+            with self.subTest(fixture=fixture):
+                output: str = app_status_output("4321", read_fixture(fixture))
+                status: AppStatus = AppStatus.from_output(last_resumed, output)
+                self.assertFalse(status.focused)
+
+    def test_unfiltered_dumpsys(self):
+        # The parser must not rely on the device-side grep having run
+        for fixture, focused, last_resumed in self.DUMPSYS_FIXTURES:
+            with self.subTest(fixture=fixture):
+                output: str = f"4321\n{AppStatus._SEPARATOR}\n{read_fixture(fixture)}"
+                self.assertTrue(AppStatus.from_output(focused, output).focused)
+                self.assertFalse(AppStatus.from_output(last_resumed, output).focused)
+
+    def test_package_prefix_is_not_focused(self):
+        output: str = app_status_output(
+            "", read_fixture("dumpsys_activities_android9.txt")
+        )
+        self.assertFalse(AppStatus.from_output("com.revomon", output).focused)
+
+    def test_not_running(self):
+        output: str = app_status_output(
+            "", read_fixture("dumpsys_activities_android11.txt")
+        )
+        self.assertEqual(
+            AppStatus.from_output(APP, output),
+            AppStatus(running=False, focused=False, pid=None),
+        )
+
+    def test_multiple_pids(self):
+        output: str = app_status_output("4321 4388", "")
+        self.assertEqual(AppStatus.from_output(APP, output).pid, 4321)
+
+    def test_empty_output(self):
+        self.assertEqual(
+            AppStatus.from_output(APP, ""),
+            AppStatus(running=False, focused=False, pid=None),
+        )
+
+
+def boot_status_output(boot_completed: str, bootanim: str, package_path: str) -> str:
+    """Build what 'BootStatus.command' prints."""
+    separator: str = BootStatus._SEPARATOR
+    return f"{boot_completed}\n{separator}\n{bootanim}\n{separator}\n{package_path}\n"
+
+
+class BootStatusTest(unittest.TestCase):
+    PACKAGE_PATH: str = "package:/system/framework/framework-res.apk"
+
+    def test_ready(self):
+        status: BootStatus = BootStatus.from_output(
+            boot_status_output("1", "stopped", self.PACKAGE_PATH)
+        )
+        self.assertEqual(status, BootStatus(True, True, True))
+        self.assertTrue(status.ready)
+
+    def test_without_boot_animation_service(self):
+        status: BootStatus = BootStatus.from_output(
+            boot_status_output("1", "", self.PACKAGE_PATH)
+        )
+        self.assertTrue(status.ready)
+
+    def test_booting(self):
+        for output in (
+            boot_status_output("", "running", ""),
+            boot_status_output("1", "running", self.PACKAGE_PATH),
+            boot_status_output("1", "stopped", ""),
+        ):
+            with self.subTest(output=output):
+                self.assertFalse(BootStatus.from_output(output).ready)
+
+    def test_empty_output(self):
+        self.assertFalse(BootStatus.from_output("").ready)
+
+
+class TouchDeviceTest(unittest.TestCase):
+    def test_prefers_multitouch(self):
+        device = SendeventTouch.parse_touch_device(
+            read_fixture("getevent_bluestacks.txt")
+        )
+        self.assertEqual(device.path, "/dev/input/event2")
+        self.assertEqual(
+            (device.x_code, device.y_code), (ABS_MT_POSITION_X, ABS_MT_POSITION_Y)
+        )
+        self.assertEqual((device.x_min, device.x_max), (0, 32767))
+        self.assertEqual((device.y_min, device.y_max), (0, 32767))
+        self.assertTrue(device.multitouch)
+
+    def test_single_touch_fallback(self):
+        getevent: str = read_fixture("getevent_bluestacks.txt")
+        # Only the devices listed before device 3
+        getevent = getevent[: getevent.index("add device 3:")]
+        device = SendeventTouch.parse_touch_device(getevent)
+        self.assertEqual(device.path, "/dev/input/event1")
+        self.assertEqual((device.x_code, device.y_code), (ABS_X, ABS_Y))
+        self.assertEqual((device.x_max, device.y_max), (1919, 1079))
+        self.assertFalse(device.multitouch)
+
+    def test_no_touch_device(self):
+        getevent: str = read_fixture("getevent_bluestacks.txt")
+        # Only the devices listed before device 2
+        getevent = getevent[: getevent.index("add device 2:")]
+        self.assertIsNone(SendeventTouch.parse_touch_device(getevent))
+
+
+def raw_screencap(pixels: np.ndarray, pixel_format: int, colorspace: bool) -> bytes:
+    """Build plain 'screencap' output, with the Android 9+ colorspace field or without."""
+    height, width = pixels.shape[:2]
+    header: bytes = struct.pack("<III", width, height, pixel_format)
+    if colorspace:
+        header += struct.pack("<I", 1)
+    return header + pixels.tobytes()
+
+
+class RawScreencapTest(unittest.TestCase):
+    PIXELS: np.ndarray = np.arange(3 * 2 * 4, dtype=np.uint8).reshape(3, 2, 4)
+
+    def test_rgba(self):
+        for pixel_format in (RGBA_8888, RGBX_8888):
+            for colorspace in (False, True):
+                with self.subTest(pixel_format=pixel_format, colorspace=colorspace):
+                    frame: np.ndarray = parse_raw_screencap(
+                        raw_screencap(self.PIXELS, pixel_format, colorspace)
+                    )
+                    np.testing.assert_array_equal(frame, self.PIXELS)
+
+    def test_bgra(self):
+        frame: np.ndarray = parse_raw_screencap(
+            raw_screencap(self.PIXELS, BGRA_8888, colorspace=True)
+        )
+        np.testing.assert_array_equal(frame, self.PIXELS[..., [2, 1, 0, 3]])
+
+    def test_invalid_output(self):
+        for data in (
+            b"\x00" * 8,
+            raw_screencap(self.PIXELS, 4, colorspace=True),
+            raw_screencap(self.PIXELS, RGBA_8888, colorspace=True)[:-1],
+        ):
+            with self.subTest(size=len(data)):
+                with self.assertRaises(ValueError):
+                    parse_raw_screencap(data)
+
+
+if __name__ == "__main__":
+    unittest.main()